@@ -1,4 +1,14 @@
 import pygame
+import struct
+from atlas import load_sheet
+
+# current and last state ids, start, current and remaining hold frames of the
+# current state, the pending request and the wall clock of the last frame
+ANIMATOR_STATE = struct.Struct("<7iq")
+# time banked towards the next frame by one scheduler bucket
+BUCKET_STATE = struct.Struct("<d")
+# every flipped variant a frame can be drawn with, besides the frame itself
+FLIPS = ((True, False), (False, True), (True, True))
 
 
 def get_image(
@@ -9,16 +19,42 @@ def get_image(
     height: int,
     color_key: tuple = (0, 0, 0),
 ):
-    new_img = pygame.Surface((width, height))
-    new_img.set_colorkey(color_key)
-    new_img.blit(
-        original_image,
-        (0, 0),
-        (col * width, row * height, (col * width) + width, (row * height) + height),
-    )
+    # frames are views into the shared sheet so no pixels are copied
+    new_img = original_image.subsurface((col * width, row * height, width, height))
+    if color_key is not None:
+        new_img.set_colorkey(color_key)
     return new_img
 
 
+def get_frame_area(frame: pygame.Surface):
+    return pygame.Rect(frame.get_abs_offset(), frame.get_size())
+
+
+def get_frame_mask(frame: pygame.Surface):
+    mask = pygame.mask.from_surface(frame)
+    # sheets loaded before a display exists keep their alpha as well as the colour
+    # key, from_surface only looks at the key so the alpha is masked in here
+    if frame.get_colorkey() is not None and frame.get_flags() & pygame.SRCALPHA:
+        unkeyed = frame.copy()
+        unkeyed.set_colorkey(None)
+        mask = mask.overlap_mask(pygame.mask.from_surface(unkeyed), (0, 0))
+    return mask
+
+
+def get_frame_blit(frame: pygame.Surface, position: tuple):
+    # flipped frames are copies rather than views, so they have no sheet to use
+    if frame.get_parent() is None:
+        return frame, position
+    return frame.get_abs_parent(), position, get_frame_area(frame)
+
+
+def draw_frames(surface: pygame.Surface, frames: list[tuple]):
+    # frames is a list of (frame, position), each blitted straight from its sheet
+    surface.blits(
+        [get_frame_blit(frame, position) for frame, position in frames], False
+    )
+
+
 def load_animation(
     sprite_sheet: str,
     row: int,
@@ -28,15 +64,27 @@ def load_animation(
     height: int,
     color_key: tuple = (0, 0, 0),
 ):
+    sheet = load_sheet(sprite_sheet, color_key)
     return [
-        get_image(
-            pygame.image.load(sprite_sheet), row, col + i[1], width, height, color_key
-        )
+        get_image(sheet, row, col + i[1], width, height, color_key)
         for i in enumerate(range(stop - col))
     ]
 
 
 class State:
+    __slots__ = (
+        "state",
+        "state_id",
+        "start_frame",
+        "current_frame",
+        "hold",
+        "hold_frames",
+        "num_frames",
+        "interrupt",
+        "interrupt_states",
+        "interrupt_mask",
+    )
+
     def __init__(
         self,
         state: str,
@@ -45,25 +93,80 @@ class State:
         num_frames: int,
         interrupt: bool,
         interrupt_states: list[str],
+        state_id: int = -1,
+        interrupt_mask: int = 0,
     ):
         self.state = state
+        self.state_id = state_id
         self.start_frame = start_frame
         self.current_frame = start_frame
         self.hold = hold
+        self.hold_frames = num_frames
         self.num_frames = num_frames
         self.interrupt = interrupt
         self.interrupt_states = interrupt_states
+        self.interrupt_mask = interrupt_mask
+
+
+class TransitionTable:
+    def __init__(self):
+        self.ids = {}
+        self.rules = []
+
+    def add_state(
+        self,
+        state: str,
+        hold: bool = False,
+        num_frames: int = 0,
+        interrupt: bool = False,
+        interrupt_states: list[str] = (),
+    ):
+        self.ids[state] = len(self.rules)
+        self.rules.append((state, hold, num_frames, interrupt, tuple(interrupt_states)))
+        return self.ids[state]
+
+    def get_mask(self, states: list[str]):
+        mask = 0
+        for state in states:
+            mask |= 1 << self.ids[state]
+        return mask
+
+    def create_states(self):
+        # every animator gets its own preallocated states, requests only pick an id
+        states = []
+        for state, hold, num_frames, interrupt, interrupt_states in self.rules:
+            states.append(
+                State(
+                    state,
+                    0,
+                    hold,
+                    num_frames,
+                    interrupt,
+                    interrupt_states,
+                    len(states),
+                    self.get_mask(interrupt_states),
+                )
+            )
+        return states
 
 
 class Animator:
     def __init__(self, cooldown: int):
         self.cooldown = cooldown
         self.last_update = 0
+        # set while an AnimationScheduler is ticking this animator
+        self.scheduled = False
 
         self.animation_index = {}
+        self.frame_areas = {}
+        self.flipped_index = {}
+        self.mask_index = {}
+        self.table = None
+        self.states = []
         self.last_state = None
         self.current_state = None
-        self.requested_state = None
+        self.requested_id = -1
+        self.requested_frame = 0
 
     def init_state(
         self,
@@ -75,17 +178,105 @@ class Animator:
         width: int,
         height: int,
         color_key: tuple = (0, 0, 0),
+        precompute_flips: bool = True,
     ):
         self.animation_index[state] = load_animation(
             sprite_sheet, row, col, stop, width, height, color_key
         )
+        self.frame_areas[state] = [
+            get_frame_area(frame) for frame in self.animation_index[state]
+        ]
+        self.mask_index.pop((state, False, False), None)
+        self.get_frame_masks(state, False, False)
+        for flip in FLIPS:
+            self.flipped_index.pop((state, *flip), None)
+            self.mask_index.pop((state, *flip), None)
+            if precompute_flips:
+                self.get_frame_masks(state, *flip)
+
+    def get_flipped_frames(self, state: str, flip_x: bool, flip_y: bool):
+        if not (flip_x or flip_y):
+            return self.animation_index[state]
+        # flipped variants are built once per state and reused every draw
+        key = (state, flip_x, flip_y)
+        if key not in self.flipped_index:
+            self.flipped_index[key] = [
+                pygame.transform.flip(frame, flip_x, flip_y)
+                for frame in self.animation_index[state]
+            ]
+        return self.flipped_index[key]
 
-    def request_state(state: str, start_frame: int, hold: bool, num_frames: int, interrupt: bool, interrupt_states: list[str]):
-        self.requested_state = State(state, start_frame, hold, num_frames, interrupt,  interrupt_states)
+    def get_frame_masks(self, state: str, flip_x: bool, flip_y: bool):
+        # init_state builds every variant up front, so collision checks only look
+        # them up unless precompute_flips was turned off
+        key = (state, flip_x, flip_y)
+        if key not in self.mask_index:
+            self.mask_index[key] = [
+                get_frame_mask(frame)
+                for frame in self.get_flipped_frames(state, flip_x, flip_y)
+            ]
+        return self.mask_index[key]
+
+    def set_table(self, table: TransitionTable, start_state: str):
+        self.table = table
+        self.states = table.create_states()
+        self.current_state = None
+        self.request(table.ids[start_state])
+        self.enter_state()
+
+    def request(self, state_id: int, start_frame: int = 0):
+        self.requested_id = state_id
+        self.requested_frame = start_frame
+
+    def request_state(self, state: str, start_frame: int = 0):
+        self.request(self.table.ids[state], start_frame)
+
+    def enter_state(self):
+        state = self.states[self.requested_id]
+        state.start_frame = self.requested_frame
+        state.current_frame = self.requested_frame
+        state.num_frames = state.hold_frames
+        self.last_state = self.current_state or state
+        self.current_state = state
 
     def get_last_state(self):
         return self.last_state
 
+    def pack_state(self, buffer: bytearray, offset: int = 0):
+        current_state = self.current_state
+        ANIMATOR_STATE.pack_into(
+            buffer,
+            offset,
+            current_state.state_id,
+            self.last_state.state_id,
+            current_state.start_frame,
+            current_state.current_frame,
+            current_state.num_frames,
+            self.requested_id,
+            self.requested_frame,
+            self.last_update,
+        )
+        return offset + ANIMATOR_STATE.size
+
+    def unpack_state(self, buffer: bytearray, offset: int = 0):
+        (
+            state_id,
+            last_state_id,
+            start_frame,
+            current_frame,
+            num_frames,
+            self.requested_id,
+            self.requested_frame,
+            self.last_update,
+        ) = ANIMATOR_STATE.unpack_from(buffer, offset)
+        # only the current state carries frame counts, the rest reset on entry
+        current_state = self.current_state = self.states[state_id]
+        self.last_state = self.states[last_state_id]
+        current_state.start_frame = start_frame
+        current_state.current_frame = current_frame
+        current_state.num_frames = num_frames
+        return offset + ANIMATOR_STATE.size
+
     def update_frame(self):
         ct = pygame.time.get_ticks()
         if ct - self.last_update < self.cooldown:
@@ -94,47 +285,123 @@ class Animator:
         return True
 
     def switch_states(self):
+        current_state = self.current_state
         # checks if a frame is needed to be held
-        if not self.current_state.hold:
-            self.last_state = self.current_state
-            self.current_state = self.requested_state
+        if not current_state.hold:
+            # re-requesting the running state keeps its frame count going
+            if self.requested_id != current_state.state_id:
+                self.enter_state()
             return
         # if held for required frames go to requested state
-        if self.current_state.num_frames > 0:
-            self.last_state = self.current_state
-            self.current_state = self.requested_state
-            return
-        # check if interrupt can be done
-        if not self.current_state.interrupt:
+        if current_state.num_frames <= 0:
+            self.enter_state()
             return
         # check if requested state can interrupt current state
-        if self.requested_state.state in self.current_state.interrupt_states:
-            self.last_state = self.current_state
-            self.current_state = self.requested_state
-            return
+        if (
+            current_state.interrupt
+            and current_state.interrupt_mask >> self.requested_id & 1
+        ):
+            self.enter_state()
 
     def update(self):
         if self.update_frame():
-            self.switch_states()
-        else:
-            return
+            self.step()
+
+    def step(self):
+        self.switch_states()
         self.current_state.current_frame += 1
         if self.current_state.hold:
             self.current_state.num_frames -= 1
             self.current_state.current_frame = self.current_state.start_frame
-        if self.frame > len(self.animation_index[self.current_state.state]) - 1:
-            self.frame = 0
+        if (
+            self.current_state.current_frame
+            > len(self.animation_index[self.current_state.state]) - 1
+        ):
+            self.current_state.current_frame = 0
 
-    def get_frame(self):
+    def get_frame(self, flip_x: bool = False, flip_y: bool = False):
         if (
             self.current_state.current_frame
             > len(self.animation_index[self.current_state.state]) - 1
         ):
             self.current_state.current_frame = 0
-        return self.animation_index[self.current_state.state][
+        return self.get_flipped_frames(self.current_state.state, flip_x, flip_y)[
             self.current_state.current_frame
         ]
 
+    def get_mask(self, flip_x: bool = False, flip_y: bool = False):
+        self.get_frame()
+        return self.get_frame_masks(self.current_state.state, flip_x, flip_y)[
+            self.current_state.current_frame
+        ]
+
+    def get_frame_area(self):
+        # area of the current frame inside its sheet, for blitting from the atlas
+        self.get_frame()
+        return self.frame_areas[self.current_state.state][
+            self.current_state.current_frame
+        ]
+
+
+class AnimationBucket:
+    def __init__(self, cooldown: int):
+        self.cooldown = cooldown
+        self.elapsed = 0
+        self.animators = []
+
+
+class AnimationScheduler:
+    def __init__(self):
+        # animators sharing a cooldown tick together off one timer
+        self.buckets = {}
+        self.time_scale = 1
+        self.paused = False
+
+    def add(self, animator: Animator):
+        # a bucket steps once per cooldown of banked time, zero would never catch up
+        if animator.cooldown <= 0:
+            raise ValueError(f"cooldown must be positive, got {animator.cooldown}")
+        bucket = self.buckets.get(animator.cooldown)
+        if bucket is None:
+            bucket = AnimationBucket(animator.cooldown)
+            self.buckets[animator.cooldown] = bucket
+        bucket.animators.append(animator)
+        animator.scheduled = True
+
+    def remove(self, animator: Animator):
+        bucket = self.buckets[animator.cooldown]
+        bucket.animators.remove(animator)
+        if not bucket.animators:
+            del self.buckets[animator.cooldown]
+        animator.scheduled = False
+
+    def get_state_size(self):
+        return BUCKET_STATE.size * len(self.buckets)
+
+    def pack_state(self, buffer: bytearray, offset: int = 0):
+        for bucket in self.buckets.values():
+            BUCKET_STATE.pack_into(buffer, offset, bucket.elapsed)
+            offset += BUCKET_STATE.size
+        return offset
+
+    def unpack_state(self, buffer: bytearray, offset: int = 0):
+        for bucket in self.buckets.values():
+            (bucket.elapsed,) = BUCKET_STATE.unpack_from(buffer, offset)
+            offset += BUCKET_STATE.size
+        return offset
+
+    def update(self, dt: float):
+        # dt is simulation time in seconds, cooldowns are in milliseconds
+        if self.paused:
+            return
+        elapsed = dt * 1000 * self.time_scale
+        for bucket in self.buckets.values():
+            bucket.elapsed += elapsed
+            while bucket.elapsed >= bucket.cooldown:
+                bucket.elapsed -= bucket.cooldown
+                for animator in bucket.animators:
+                    animator.step()
+
 
 # class Animator:
 #     def __init__(self, cooldown: int):
@@ -0,0 +1,125 @@
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from atlas import ATLAS_CACHE, convert_sheet
+from animator import Animator
+
+
+class AssetHandle:
+    def __init__(self, future, finish):
+        self.future = future
+        self.finish = finish
+        self.callbacks = []
+        self.error_callbacks = []
+        self.value = None
+        self.error = None
+        self.ready = False
+
+    def on_ready(self, callback):
+        # callbacks always run on the main thread, straight away if already loaded
+        if self.ready:
+            callback(self.value)
+        elif self.error is None:
+            self.callbacks.append(callback)
+
+    def on_error(self, callback):
+        if self.error is not None:
+            callback(self.error)
+        elif not self.ready:
+            self.error_callbacks.append(callback)
+
+    def complete(self):
+        # a failed load is kept on the handle instead of raising out of poll
+        try:
+            self.value = self.finish(self.future.result())
+        except Exception as error:
+            self.error = error
+            callbacks = self.error_callbacks
+            self.callbacks = []
+            self.error_callbacks = []
+            for callback in callbacks:
+                callback(error)
+            return
+        self.ready = True
+        callbacks = self.callbacks
+        self.callbacks = []
+        self.error_callbacks = []
+        for callback in callbacks:
+            callback(self.value)
+
+
+class AssetLoader:
+    def __init__(self, workers: int = 4):
+        self.executor = ThreadPoolExecutor(workers)
+        self.pending = []
+        self.sheets = {}
+        self.total = 0
+        self.finished = 0
+        self.failed = []
+
+    def load_sheet(self, sprite_sheet: str, color_key: tuple = (0, 0, 0)):
+        key = (sprite_sheet, color_key)
+        if key in self.sheets:
+            return self.sheets[key]
+
+        # decoding happens on a worker, display conversion waits for poll
+        def finish(image: pygame.Surface):
+            return ATLAS_CACHE.add_sheet(
+                sprite_sheet, color_key, convert_sheet(image, color_key)
+            )
+
+        future = self.executor.submit(pygame.image.load, sprite_sheet)
+        handle = AssetHandle(future, finish)
+        self.sheets[key] = handle
+        self.pending.append(handle)
+        self.total += 1
+        return handle
+
+    def load_state(
+        self,
+        animator: Animator,
+        state: str,
+        sprite_sheet: str,
+        row: int,
+        col: int,
+        stop: int,
+        width: int,
+        height: int,
+        color_key: tuple = (0, 0, 0),
+    ):
+        # the state is swapped into the animator once its sheet is in the cache
+        handle = self.load_sheet(sprite_sheet, color_key)
+        handle.on_ready(
+            lambda sheet: animator.init_state(
+                state, sprite_sheet, row, col, stop, width, height, color_key
+            )
+        )
+        return handle
+
+    def poll(self, max_assets: int = None):
+        # call once a frame from the main thread
+        still_pending = []
+        completed = []
+        for handle in self.pending:
+            if handle.future.done() and (max_assets is None or max_assets > 0):
+                completed.append(handle)
+                if max_assets is not None:
+                    max_assets -= 1
+            else:
+                still_pending.append(handle)
+        # handles leave pending before their callbacks run, so a callback that
+        # raises can't make the next poll complete them again
+        self.pending = still_pending
+        self.finished += len(completed)
+        for handle in completed:
+            handle.complete()
+            if handle.error is not None:
+                self.failed.append(handle)
+
+    def get_progress(self):
+        return self.finished / self.total if self.total else 1
+
+    def is_done(self):
+        return not self.pending
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
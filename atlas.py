@@ -0,0 +1,63 @@
+import pygame
+from collections import OrderedDict
+
+
+def get_surface_bytes(surface: pygame.Surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def convert_sheet(sheet: pygame.Surface, color_key: tuple = (0, 0, 0)):
+    # conversion needs a display mode, so only match the display format once one exists
+    if pygame.display.get_surface() is not None:
+        if color_key is None:
+            sheet = sheet.convert_alpha()
+        else:
+            sheet = sheet.convert()
+    if color_key is not None:
+        sheet.set_colorkey(color_key)
+    return sheet
+
+
+class AtlasCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.sheets = OrderedDict()
+
+    def get_sheet(self, sprite_sheet: str, color_key: tuple = (0, 0, 0)):
+        key = (sprite_sheet, color_key)
+        if key in self.sheets:
+            self.sheets.move_to_end(key)
+            return self.sheets[key]
+        sheet = convert_sheet(pygame.image.load(sprite_sheet), color_key)
+        return self.add_sheet(sprite_sheet, color_key, sheet)
+
+    def add_sheet(self, sprite_sheet: str, color_key: tuple, sheet: pygame.Surface):
+        # for sheets decoded elsewhere, sheet must already be converted
+        key = (sprite_sheet, color_key)
+        if key in self.sheets:
+            self.used_bytes -= get_surface_bytes(self.sheets[key])
+        self.sheets[key] = sheet
+        self.sheets.move_to_end(key)
+        self.used_bytes += get_surface_bytes(sheet)
+        self.evict()
+        return sheet
+
+    def evict(self):
+        # drop least recently used sheets until under budget, always keep the newest one
+        while self.used_bytes > self.max_bytes and len(self.sheets) > 1:
+            _, sheet = self.sheets.popitem(last=False)
+            self.used_bytes -= get_surface_bytes(sheet)
+
+    def invalidate(self, sprite_sheet: str = None):
+        # invalidates every color key variant of a sheet, or the whole cache
+        for key in list(self.sheets):
+            if sprite_sheet is None or key[0] == sprite_sheet:
+                self.used_bytes -= get_surface_bytes(self.sheets.pop(key))
+
+
+ATLAS_CACHE = AtlasCache()
+
+
+def load_sheet(sprite_sheet: str, color_key: tuple = (0, 0, 0)):
+    return ATLAS_CACHE.get_sheet(sprite_sheet, color_key)
@@ -0,0 +1,346 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from animator import AnimationScheduler, Animator, TransitionTable
+from collider import Collider
+from input_source import INPUT_LEFT, INPUT_RIGHT, INPUT_UP, InputKeys, ReplaySource
+from player import Player
+from renderer import RenderQueue
+from spatial_hash import SpatialHash
+
+SPRITE_SHEET = "Triangle_Man_Sprites.png"
+PLAYER_STATES = (
+    ("Idle", 8, 18),
+    ("Run", 0, 8),
+    ("Transition", 22, 23),
+    ("Jump", 18, 21),
+    ("Land", 21, 22),
+)
+RUN_CYCLE = 240
+JUMP_CYCLE = 90
+# steps until the scripted run and jump patterns line up again
+SCRIPT_CYCLE = math.lcm(RUN_CYCLE, JUMP_CYCLE)
+# bytes a warmed up step may have allocated at its peak, even if it frees them
+# again, covers the Rect pygame returns from every fill and blit plus the loop
+# iterators and argument tuples CPython makes, together under 200 bytes, a list,
+# dict or Rect built per query pushes a step past it
+FRAME_ALLOCATION_LIMIT = 256
+# a queued draw keeps its (image, position) pair, the position's floats and a
+# sort key alive until the queue flushes, a little over 200 bytes
+QUEUED_DRAW_BYTES = 256
+
+
+class ScriptedSource:
+    # an input source that follows a fixed run and jump pattern
+    def __init__(self):
+        self.frame = 0
+        self.keys = InputKeys()
+
+    def poll(self):
+        self.frame += 1
+        phase = self.frame % RUN_CYCLE
+        mask = 0
+        if phase < 100:
+            mask |= INPUT_RIGHT
+        elif 120 <= phase < 220:
+            mask |= INPUT_LEFT
+        if self.frame % JUMP_CYCLE < 10:
+            mask |= INPUT_UP
+        self.keys.mask = mask
+        return self.keys
+
+
+def create_animator(template: Animator = None):
+    animator = Animator(100)
+    if template is None:
+        for state, col, stop in PLAYER_STATES:
+            animator.init_state(state, SPRITE_SHEET, 0, col, stop, 16, 17)
+    else:
+        # sharing the frame tables keeps 10k animators from slicing 10k sheets
+        animator.animation_index = template.animation_index
+        animator.frame_areas = template.frame_areas
+        animator.flipped_index = template.flipped_index
+        animator.mask_index = template.mask_index
+    return animator
+
+
+def create_player(template: Animator = None):
+    return Player((16, 0), 12, 14, create_animator(template), "Idle")
+
+
+class PlayerScenario:
+    allocation_limit = FRAME_ALLOCATION_LIMIT
+
+    def __init__(self, surface: pygame.Surface, source=None):
+        self.surface = surface
+        self.source = source or ScriptedSource()
+        self.player = create_player()
+        # animation runs off the step too, so a replay lands on the same frames
+        self.scheduler = AnimationScheduler()
+        self.scheduler.add(self.player.animator)
+        # wide enough that the scripted run never walks off the edge
+        self.colliders = [Collider((-10000, 150), 20000, 30)]
+        self.offset = pygame.Vector2()
+
+    def step(self, dt: float):
+        self.player.keys = self.source.poll()
+        self.scheduler.update(dt)
+        self.player.update(dt, 400, self.colliders)
+        self.surface.fill((255, 241, 232))
+        self.player.draw(self.surface, self.offset)
+
+
+class CollidersScenario(PlayerScenario):
+    def __init__(self, surface: pygame.Surface, source=None, count: int = 1000):
+        super().__init__(surface, source)
+        rng = random.Random(0)
+        self.colliders = SpatialHash(32)
+        self.colliders.insert(Collider((-10000, 150), 20000, 30))
+        for _ in range(count - 1):
+            position = (rng.randrange(-2000, 2000), rng.randrange(160, 2000))
+            self.colliders.insert(Collider(position, 16, 16))
+
+
+class AnimatedScenario:
+    def __init__(self, surface: pygame.Surface, count: int = 10000):
+        self.surface = surface
+        self.queue = RenderQueue(surface)
+        template = create_animator()
+        table = TransitionTable()
+        for state, _, _ in PLAYER_STATES:
+            table.add_state(state)
+        rng = random.Random(0)
+        self.scheduler = AnimationScheduler()
+        self.entities = []
+        self.allocation_limit = FRAME_ALLOCATION_LIMIT + QUEUED_DRAW_BYTES * count
+        for _ in range(count):
+            animator = create_animator(template)
+            animator.set_table(table, rng.choice(PLAYER_STATES)[0])
+            self.scheduler.add(animator)
+            entity = Collider((rng.randrange(320), rng.randrange(180)), 12, 14)
+            self.entities.append((entity, animator))
+
+    def step(self, dt: float):
+        self.scheduler.update(dt)
+        self.surface.fill((255, 241, 232))
+        for entity, animator in self.entities:
+            entity.image = animator.get_frame()
+            entity.draw(self.queue, pygame.Vector2())
+        self.queue.flush()
+
+
+SCENARIOS = {
+    "player": PlayerScenario,
+    "colliders": CollidersScenario,
+    "animated": AnimatedScenario,
+}
+
+
+def get_percentile(values: list[float], percent: float):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def create_scenario(name: str, replay: str = None):
+    surface = pygame.Surface((320, 180))
+    scenario = SCENARIOS[name]
+    # recordings only drive the scenarios that have a player to control
+    if replay is not None and issubclass(scenario, PlayerScenario):
+        return scenario(surface, ReplaySource.load(replay, loop=True))
+    return scenario(surface)
+
+
+def run_scenario(
+    name: str, frames: int, dt: float, track_allocations: bool, replay: str = None
+):
+    scenario = create_scenario(name, replay)
+    frame_times = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        scenario.step(dt)
+        frame_times.append(time.perf_counter() - frame_start)
+    total = time.perf_counter() - start
+
+    result = {
+        "scenario": name,
+        "frames": frames,
+        "fps": frames / total,
+        "p50_ms": get_percentile(frame_times, 50) * 1000,
+        "p99_ms": get_percentile(frame_times, 99) * 1000,
+        "max_ms": max(frame_times) * 1000,
+    }
+    if track_allocations:
+        # tracing skews timings, so allocations are measured on a second pass
+        tracemalloc.start()
+        allocated = []
+        for _ in range(frames):
+            peak, retained = get_step_allocation(scenario, dt)
+            allocated.append(peak)
+        tracemalloc.stop()
+        result["p50_alloc_bytes"] = get_percentile(allocated, 50)
+        result["p99_alloc_bytes"] = get_percentile(allocated, 99)
+        result["last_frame_retained_bytes"] = retained
+    return result
+
+
+def get_step_allocation(scenario, dt: float):
+    # returns the bytes allocated at the step's peak and the bytes it kept, needs
+    # tracemalloc running, the peak is reset after reading so the reading itself
+    # isn't counted
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    scenario.step(dt)
+    current, peak = tracemalloc.get_traced_memory()
+    return peak - before, current - before
+
+
+def check_allocations(name: str, frames: int, dt: float, replay: str = None):
+    return check_scenario_allocations(create_scenario(name, replay), frames, dt)
+
+
+def check_scenario_allocations(scenario, frames: int, dt: float):
+    # returns the steps that allocated past the scenario's limit and the lines of
+    # this repo that kept memory across steady-state frames
+    root = os.path.dirname(os.path.abspath(__file__))
+    filters = [tracemalloc.Filter(True, os.path.join(root, "*.py"))]
+    # tracing starts before the warm up so objects that are only swapped out
+    # every frame are traced on both sides of the comparison
+    tracemalloc.start()
+    # warm up past one full input cycle so every cache is already filled, a
+    # looping recording repeats once per its own length
+    cycle = SCRIPT_CYCLE
+    if isinstance(getattr(scenario, "source", None), ReplaySource):
+        cycle = len(scenario.source.masks)
+    for _ in range(max(frames, cycle)):
+        scenario.step(dt)
+    # measured before any collection, the steps after gc.collect() would be
+    # charged for refilling the freelists it empties
+    worst = 0
+    for _ in range(frames):
+        allocated = get_step_allocation(scenario, dt)[0]
+        if allocated > worst:
+            worst = allocated
+    snapshots = []
+    for window in range(3):
+        if window:
+            for _ in range(frames):
+                scenario.step(dt)
+        # a full collection also empties the float and tuple freelists, whose
+        # blocks would otherwise stay traced to whichever line last freed them
+        gc.collect()
+        snapshots.append(tracemalloc.take_snapshot().filter_traces(filters))
+    tracemalloc.stop()
+
+    # only lines that keep growing through both windows are real per-frame
+    # allocations
+    first = {
+        stat.traceback: stat.size_diff
+        for stat in snapshots[1].compare_to(snapshots[0], "lineno")
+    }
+    limit = scenario.allocation_limit
+    over = []
+    if worst > limit:
+        over.append(f"a step allocated {worst} bytes, the limit is {limit}")
+    return over + [
+        str(stat)
+        for stat in snapshots[2].compare_to(snapshots[1], "lineno")
+        if stat.size_diff > 0 and first.get(stat.traceback, 0) > 0
+    ]
+
+
+def check_determinism(name: str, frames: int, dt: float, replay: str = None):
+    # runs the same input twice from scratch, returns the first step where the
+    # packed player state differs or None if both runs match
+    runs = [create_scenario(name, replay) for _ in range(2)]
+    states = [bytearray(scenario.player.get_state_size()) for scenario in runs]
+    for frame in range(frames):
+        for scenario, state in zip(runs, states):
+            scenario.step(dt)
+            scenario.player.pack_state(state)
+        if states[0] != states[1]:
+            return frame
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless performance benchmark")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--no-allocations", action="store_true")
+    parser.add_argument("--output", help="write results as json to this file")
+    parser.add_argument(
+        "--replay", help="drive the player scenarios from an input recording"
+    )
+    parser.add_argument(
+        "--check-allocations",
+        action="store_true",
+        help="fail if any scenario allocates past its limit once warmed up",
+    )
+    parser.add_argument(
+        "--check-determinism",
+        action="store_true",
+        help="fail if replaying the same input twice gives different results",
+    )
+    args = parser.parse_args()
+    # timings and percentiles need at least one measured frame
+    if args.frames <= 0:
+        parser.error("--frames must be positive")
+
+    pygame.init()
+    pygame.display.set_mode((320, 180))
+    if args.check_allocations:
+        failed = False
+        for name in args.scenarios:
+            growth = check_allocations(name, args.frames, args.dt, args.replay)
+            print(f"{name}: {'ok' if not growth else 'allocating'}")
+            for line in growth:
+                print(f"    {line}")
+            failed = failed or bool(growth)
+        pygame.quit()
+        sys.exit(1 if failed else 0)
+    if args.check_determinism:
+        failed = False
+        for name in args.scenarios:
+            if not issubclass(SCENARIOS[name], PlayerScenario):
+                continue
+            frame = check_determinism(name, args.frames, args.dt, args.replay)
+            print(f"{name}: {'ok' if frame is None else f'diverged at step {frame}'}")
+            failed = failed or frame is not None
+        pygame.quit()
+        sys.exit(1 if failed else 0)
+
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": [
+            run_scenario(
+                name, args.frames, args.dt, not args.no_allocations, args.replay
+            )
+            for name in args.scenarios
+        ],
+    }
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import pygame
+import math
+from spatial_hash import SpatialHash
+
+
+class Camera:
+    def __init__(self, size: tuple, smoothing: float = 8, bounds: pygame.Rect = None):
+        self.size = pygame.Vector2(size)
+        self.smoothing = smoothing
+        self.bounds = bounds
+        self.position = pygame.Vector2()
+        self.last_position = pygame.Vector2()
+
+    def snap_to(self, target: pygame.Vector2):
+        self.position.update(pygame.Vector2(target) - self.size * 0.5)
+        self.clamp()
+        self.last_position.update(self.position)
+
+    def clamp(self):
+        if self.bounds is None:
+            return
+        self.position.x = max(
+            min(self.position.x, self.bounds.right - self.size.x), self.bounds.left
+        )
+        self.position.y = max(
+            min(self.position.y, self.bounds.bottom - self.size.y), self.bounds.top
+        )
+
+    def follow(self, target: pygame.Vector2, dt: float):
+        # called each physics step, eases towards the target the same at any step size
+        self.last_position.update(self.position)
+        goal = pygame.Vector2(target) - self.size * 0.5
+        self.position += (goal - self.position) * (1 - math.exp(-self.smoothing * dt))
+        self.clamp()
+
+    def get_offset(self, alpha: float = 1):
+        # snapped to whole pixels so the world doesn't shimmer while scrolling
+        offset = self.last_position.lerp(self.position, alpha)
+        return pygame.Vector2(round(offset.x), round(offset.y))
+
+    def get_visible_rect(self, alpha: float = 1, margin: int = 0):
+        return pygame.Rect(self.get_offset(alpha), self.size).inflate(
+            margin * 2, margin * 2
+        )
+
+    def get_visible(
+        self,
+        entities: list[pygame.sprite.Sprite] | SpatialHash,
+        alpha: float = 1,
+        margin: int = 0,
+    ):
+        # margin covers images drawn larger than their collision rects
+        visible_rect = self.get_visible_rect(alpha, margin)
+        if isinstance(entities, SpatialHash):
+            return entities.query(visible_rect)
+        return [
+            entity for entity in entities if visible_rect.colliderect(entity.rect)
+        ]
+
+    def draw(
+        self,
+        renderer,
+        entities: list[pygame.sprite.Sprite] | SpatialHash,
+        alpha: float = 1,
+        margin: int = 16,
+        layer: int = 0,
+    ):
+        offset = self.get_offset(alpha)
+        for entity in self.get_visible(entities, alpha, margin):
+            renderer.submit(entity, offset, alpha, layer=layer)
@@ -0,0 +1,87 @@
+import pygame
+from collections import OrderedDict
+from tilemap import TileMap
+
+
+class ChunkCache:
+    def __init__(
+        self,
+        tilemap: TileMap,
+        tile_images: dict[int, pygame.Surface],
+        chunk_size: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.tilemap = tilemap
+        self.tile_images = tile_images
+        self.chunk_size = chunk_size
+        self.max_chunks = max(max_bytes // (chunk_size * chunk_size * 4), 1)
+        self.chunks = OrderedDict()
+        tilemap.listeners.append(self.invalidate_tile)
+
+    def build_chunk(self, chunk_x: int, chunk_y: int):
+        size = self.chunk_size
+        ts = self.tilemap.tile_size
+        chunk = pygame.Surface((size, size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert_alpha()
+        chunk.fill((0, 0, 0, 0))
+        left = chunk_x * size // ts
+        top = chunk_y * size // ts
+        right = ((chunk_x + 1) * size - 1) // ts
+        bottom = ((chunk_y + 1) * size - 1) // ts
+        chunk.blits(
+            [
+                (
+                    self.tile_images[tile],
+                    (x * ts - chunk_x * size, y * ts - chunk_y * size),
+                )
+                for y in range(top, bottom + 1)
+                for x in range(left, right + 1)
+                if (tile := self.tilemap.get_tile(x, y)) in self.tile_images
+            ],
+            False,
+        )
+        return chunk
+
+    def get_chunk(self, chunk_x: int, chunk_y: int):
+        key = (chunk_x, chunk_y)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+        chunk = self.chunks[key] = self.build_chunk(chunk_x, chunk_y)
+        # least recently drawn chunks go first once over budget
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def invalidate_tile(self, x: int, y: int):
+        # a tile can straddle chunks when chunk_size isn't a multiple of tile_size
+        ts = self.tilemap.tile_size
+        size = self.chunk_size
+        for chunk_y in range(y * ts // size, ((y + 1) * ts - 1) // size + 1):
+            for chunk_x in range(x * ts // size, ((x + 1) * ts - 1) // size + 1):
+                self.chunks.pop((chunk_x, chunk_y), None)
+
+    def invalidate(self):
+        self.chunks = OrderedDict()
+
+    def draw(self, surface: pygame.Surface, offset: pygame.Vector2):
+        size = self.chunk_size
+        left = int(offset[0] // size)
+        top = int(offset[1] // size)
+        right = int((offset[0] + surface.get_width() - 1) // size)
+        bottom = int((offset[1] + surface.get_height() - 1) // size)
+        surface.blits(
+            [
+                (
+                    self.get_chunk(chunk_x, chunk_y),
+                    (
+                        round(chunk_x * size - offset[0]),
+                        round(chunk_y * size - offset[1]),
+                    ),
+                )
+                for chunk_y in range(top, bottom + 1)
+                for chunk_x in range(left, right + 1)
+            ],
+            False,
+        )
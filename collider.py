@@ -1,4 +1,49 @@
 import pygame
+import math
+import struct
+from spatial_hash import SpatialHash
+from tilemap import TileMap
+
+# position, last_position, velocity, rect x and y
+COLLIDER_STATE = struct.Struct("<6d2i")
+
+
+def sweep_aabb(box: tuple, dx: float, dy: float, target: pygame.Rect):
+    # returns (time, normal_x, normal_y) of the first touch while moving box by
+    # (dx, dy), time is a fraction of the move, or None if it never touches
+    left, top, width, height = box
+    if dx == 0:
+        if left + width <= target.left or left >= target.right:
+            return None
+        tx_entry, tx_exit = -math.inf, math.inf
+    elif dx > 0:
+        tx_entry = (target.left - (left + width)) / dx
+        tx_exit = (target.right - left) / dx
+    else:
+        tx_entry = (target.right - left) / dx
+        tx_exit = (target.left - (left + width)) / dx
+
+    if dy == 0:
+        if top + height <= target.top or top >= target.bottom:
+            return None
+        ty_entry, ty_exit = -math.inf, math.inf
+    elif dy > 0:
+        ty_entry = (target.top - (top + height)) / dy
+        ty_exit = (target.bottom - top) / dy
+    else:
+        ty_entry = (target.bottom - top) / dy
+        ty_exit = (target.top - (top + height)) / dy
+
+    # compared by hand, min() and max() allocate for every call and this runs
+    # for every candidate of every sweep
+    entry = tx_entry if tx_entry > ty_entry else ty_entry
+    exit_time = tx_exit if tx_exit < ty_exit else ty_exit
+    # already overlapping, out of reach this move, or only grazing a corner
+    if entry < 0 or entry > 1 or entry >= exit_time:
+        return None
+    if tx_entry > ty_entry:
+        return entry, -math.copysign(1, dx), 0
+    return entry, 0, -math.copysign(1, dy)
 
 
 class Collider(pygame.sprite.Sprite):
@@ -6,62 +51,297 @@ class Collider(pygame.sprite.Sprite):
         self.image = pygame.Surface((width, height))
         self.rect = pygame.Rect(position, (width, height))
         self.position = pygame.Vector2(position)
+        self.last_position = pygame.Vector2(position)
         self.velocity = pygame.Vector2()
+        self.swept = False
+        # reused by every collision query so the per-frame path doesn't allocate
+        self.collision_types = [False, False, False, False]
+        self.collision_rects = []
+        self.query_results = []
+        self.sweep_bounds = pygame.Rect(0, 0, 0, 0)
+        self.flipped_source = None
+        self.flipped_images = {}
+        self.mask_source = None
+        self.mask = None
+
+    def save_position(self):
+        # called before each physics step so draws can interpolate between steps
+        self.last_position.update(self.position)
+
+    def get_state_size(self):
+        return COLLIDER_STATE.size
+
+    def pack_state(self, buffer: bytearray, offset: int = 0):
+        # returns the offset just past what was written
+        COLLIDER_STATE.pack_into(
+            buffer,
+            offset,
+            self.position.x,
+            self.position.y,
+            self.last_position.x,
+            self.last_position.y,
+            self.velocity.x,
+            self.velocity.y,
+            self.rect.x,
+            self.rect.y,
+        )
+        return offset + COLLIDER_STATE.size
+
+    def unpack_state(self, buffer: bytearray, offset: int = 0):
+        # restores in place, colliders kept in a SpatialHash still need a move()
+        x, y, last_x, last_y, velocity_x, velocity_y, rect_x, rect_y = (
+            COLLIDER_STATE.unpack_from(buffer, offset)
+        )
+        self.position.update(x, y)
+        self.last_position.update(last_x, last_y)
+        self.velocity.update(velocity_x, velocity_y)
+        self.rect.x = rect_x
+        self.rect.y = rect_y
+        return offset + COLLIDER_STATE.size
+
+    def get_render_position(self, alpha: float = 1):
+        return self.last_position.lerp(self.position, alpha)
 
     def apply_gravity(self, dt: float, gravity: float, max_fall: float):
         self.velocity.y += gravity * dt
         self.velocity.y = min(self.velocity.y, max_fall)
 
-    def get_collisions(self, colliders: list[pygame.sprite.Sprite]):
+    def get_collisions(
+        self,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash,
+        rect: pygame.Rect = None,
+    ):
+        if rect is None:
+            rect = self.rect
+        if isinstance(colliders, SpatialHash):
+            return [
+                collider for collider in colliders.query(rect) if collider is not self
+            ]
         return [
-            collider for collider in colliders if self.rect.colliderect(collider.rect)
+            collider
+            for collider in colliders
+            if collider is not self and rect.colliderect(collider.rect)
         ]
 
+    def get_collision_rects(
+        self,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
+        rect: pygame.Rect = None,
+    ):
+        # the returned list is reused by the next query
+        if rect is None:
+            rect = self.rect
+        rects = self.collision_rects
+        rects.clear()
+        if isinstance(colliders, TileMap):
+            colliders.get_collisions(rect, rects)
+        elif isinstance(colliders, SpatialHash):
+            found = self.query_results
+            found.clear()
+            for collider in colliders.query(rect, found):
+                if collider is not self:
+                    rects.append(collider.rect)
+            found.clear()
+        else:
+            for collider in colliders:
+                if collider is not self and rect.colliderect(collider.rect):
+                    rects.append(collider.rect)
+        return rects
+
+    def reset_collision_types(self):
+        collision_types = self.collision_types
+        collision_types[0] = collision_types[1] = False
+        collision_types[2] = collision_types[3] = False
+        return collision_types
+
     def check_collisions(
         self,
         dt: float,
-        colliders: list[pygame.sprite.Sprite],
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
         special_colliders: list[pygame.sprite.Sprite] = [],
     ):
-        collision_types = [False, False, False, False]
-        # top, bottom, left, right
+        # top, bottom, left, right, reused between calls
+        collision_types = self.reset_collision_types()
 
         # find collisions on x-axis
         self.position.x += self.velocity.x * dt
         self.rect.x = round(self.position.x)
-        for collider in self.get_collisions(colliders):
+        for collider_rect in self.get_collision_rects(colliders):
             if self.velocity.x > 0:
-                self.rect.right = collider.rect.left
+                self.rect.right = collider_rect.left
                 collision_types[3] = True
             elif self.velocity.x < 0:
-                self.rect.left = collider.rect.right
+                self.rect.left = collider_rect.right
                 collision_types[2] = True
 
         # get collisions on y-axis
         self.position.y += self.velocity.y * dt
         self.rect.y = round(self.position.y)
-        for collider in self.get_collisions(colliders):
+        for collider_rect in self.get_collision_rects(colliders):
             if self.velocity.y > 0:
-                self.rect.bottom = collider.rect.top
+                self.rect.bottom = collider_rect.top
                 collision_types[1] = True
             elif self.velocity.y < 0:
-                self.rect.top = collider.rect.bottom
+                self.rect.top = collider_rect.bottom
                 collision_types[0] = True
-        return tuple(collision_types)
+
+        # keep dynamic bodies in the broadphase in sync with where they ended up
+        if isinstance(colliders, SpatialHash) and self in colliders:
+            colliders.move(self)
+        return collision_types
+
+    def sweep_collisions(
+        self,
+        dt: float,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
+    ):
+        # top, bottom, left, right, reused between calls
+        collision_types = self.reset_collision_types()
+
+        dx = self.velocity.x * dt
+        dy = self.velocity.y * dt
+        width = self.rect.width
+        height = self.rect.height
+        # each hit blocks one axis, so two hits and a final free slide at most,
+        # counted by hand since a range would stay allocated through the queries
+        sweep = 0
+        while sweep < 3 and (dx or dy):
+            x = self.position.x
+            y = self.position.y
+            left = math.floor(min(x, x + dx))
+            top = math.floor(min(y, y + dy))
+            bounds = self.sweep_bounds
+            bounds.update(
+                left,
+                top,
+                math.ceil(max(x, x + dx) + width) - left,
+                math.ceil(max(y, y + dy) + height) - top,
+            )
+            hit = None
+            for collider_rect in self.get_collision_rects(colliders, bounds):
+                # a sweep can't see what it starts inside, a body that begins
+                # the step embedded is pushed out by the discrete pass instead
+                if (
+                    sweep == 0
+                    and x < collider_rect.right
+                    and x + width > collider_rect.left
+                    and y < collider_rect.bottom
+                    and y + height > collider_rect.top
+                ):
+                    return self.depenetrate(dt, colliders)
+                result = sweep_aabb((x, y, width, height), dx, dy, collider_rect)
+                if result and (hit is None or result[0] < hit[0]):
+                    hit = result
+                    hit_rect = collider_rect
+            if hit is None:
+                self.position.x += dx
+                self.position.y += dy
+                break
+
+            time, normal_x, normal_y = hit
+            collider_rect = hit_rect
+            self.position.x += dx * time
+            self.position.y += dy * time
+            # snap flush to the contact so the next sweep starts touching, not inside
+            if normal_x:
+                if normal_x < 0:
+                    self.position.x = collider_rect.left - width
+                    collision_types[3] = True
+                else:
+                    self.position.x = collider_rect.right
+                    collision_types[2] = True
+                dx = 0
+            else:
+                if normal_y < 0:
+                    self.position.y = collider_rect.top - height
+                    collision_types[1] = True
+                else:
+                    self.position.y = collider_rect.bottom
+                    collision_types[0] = True
+                dy = 0
+            # slide along the contact with whatever movement is left
+            dx *= 1 - time
+            dy *= 1 - time
+            sweep += 1
+
+        self.rect.topleft = (round(self.position.x), round(self.position.y))
+        if isinstance(colliders, SpatialHash) and self in colliders:
+            colliders.move(self)
+        return collision_types
+
+    def depenetrate(
+        self,
+        dt: float,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
+    ):
+        collision_types = self.check_collisions(dt, colliders)
+        # the discrete pass only moves the rect, carry the push out over
+        if collision_types[0] or collision_types[1]:
+            self.position.y = self.rect.y
+        if collision_types[2] or collision_types[3]:
+            self.position.x = self.rect.x
+        return collision_types
+
+    def get_mask(self):
+        # rebuilt only when the image is swapped out
+        if self.mask_source is not self.image:
+            self.mask_source = self.image
+            self.mask = pygame.mask.from_surface(self.image)
+        return self.mask
+
+    def get_mask_position(self):
+        return self.rect.topleft
+
+    def get_mask_collisions(
+        self,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash,
+        rect: pygame.Rect = None,
+    ):
+        # rects narrow it down first, masks are only compared for the candidates
+        mask = self.get_mask()
+        x, y = self.get_mask_position()
+        if rect is None:
+            rect = pygame.Rect((x, y), mask.get_size())
+        hits = []
+        for collider in self.get_collisions(colliders, rect):
+            other_x, other_y = collider.get_mask_position()
+            if mask.overlap(collider.get_mask(), (other_x - x, other_y - y)):
+                hits.append(collider)
+        return hits
+
+    def get_flipped_image(self, flip_x: bool, flip_y: bool):
+        if not (flip_x or flip_y):
+            return self.image
+        # cache is rebuilt whenever the image is swapped out
+        if self.flipped_source is not self.image:
+            self.flipped_source = self.image
+            self.flipped_images = {}
+        key = (flip_x, flip_y)
+        if key not in self.flipped_images:
+            self.flipped_images[key] = pygame.transform.flip(
+                self.image, flip_x, flip_y
+            )
+        return self.flipped_images[key]
 
     def draw(
         self,
         surface: pygame.Surface,
-        image_size: tuple,
         offset: pygame.Vector2,
+        alpha: float = 1,
         flip_x: bool = False,
         flip_y: bool = False,
     ):
-        surface.blit(
-            pygame.transform.flip(self.image, flip_x, flip_y),
-            pygame.Vector2(
-                self.position.x - (image_size[0] - self.rect.width) * 0.5,
-                self.position.y - (image_size[1] - self.rect.height) * 0.5,
-            )
-            - offset,
+        # same leading arguments as every other drawable, so the camera can draw it
+        image = self.get_flipped_image(flip_x, flip_y)
+        # interpolated by hand, lerp would allocate a Vector2 every draw
+        last_position = self.last_position
+        x = last_position.x + (self.position.x - last_position.x) * alpha
+        y = last_position.y + (self.position.y - last_position.y) * alpha
+        # images larger than the rect are centred on it
+        return surface.blit(
+            image,
+            (
+                x - (image.get_width() - self.rect.width) * 0.5 - offset[0],
+                y - (image.get_height() - self.rect.height) * 0.5 - offset[1],
+            ),
         )
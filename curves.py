@@ -0,0 +1,43 @@
+import math
+import numpy as np
+
+
+def bernstein_basis(degree: int, ts: np.ndarray):
+    ts = np.asarray(ts, dtype=np.float64)[:, None]
+    i = np.arange(degree + 1)
+    binomials = np.array([math.comb(degree, k) for k in range(degree + 1)])
+    return binomials * (1 - ts) ** (degree - i) * ts**i
+
+
+def evaluate_bezier(points: np.ndarray, ts: np.ndarray):
+    # points is (degree + 1, 2) for one curve or (curves, degree + 1, 2) for many,
+    # the result is (len(ts), 2) or (curves, len(ts), 2)
+    points = np.asarray(points, dtype=np.float64)
+    basis = bernstein_basis(points.shape[-2] - 1, ts)
+    return np.ascontiguousarray(np.einsum("ti,...ij->...tj", basis, points))
+
+
+def get_segment_count(points: np.ndarray, tolerance: float):
+    # a degree n curve drawn as k even segments strays at most
+    # n(n - 1) / 8 * max|P[i + 2] - 2P[i + 1] + P[i]| / k^2 from the real curve
+    if tolerance is None or tolerance <= 0:
+        raise ValueError(f"tolerance must be positive, got {tolerance}")
+    points = np.asarray(points, dtype=np.float64)
+    degree = points.shape[-2] - 1
+    if degree < 2:
+        return 1
+    second_diff = points[..., 2:, :] - 2 * points[..., 1:-1, :] + points[..., :-2, :]
+    bound = degree * (degree - 1) * np.linalg.norm(second_diff, axis=-1).max() / 8
+    return max(math.ceil(math.sqrt(bound / tolerance)), 1)
+
+
+def create_curve_array(
+    points: np.ndarray, num_points: int = None, tolerance: float = None
+):
+    # same spacing as create_quad_curve/create_cubic_curve, num_points + 1 points
+    # including both ends, or enough points to stay within tolerance of the curve
+    if (num_points is None) == (tolerance is None):
+        raise ValueError("pass exactly one of num_points or tolerance")
+    if num_points is None:
+        num_points = get_segment_count(points, tolerance)
+    return evaluate_bezier(points, np.linspace(0, 1, num_points + 1))
@@ -0,0 +1,42 @@
+import pygame
+import time
+from profiler import PROFILER
+
+
+class GameLoop:
+    def __init__(self, step: float = 1 / 60, max_steps: int = 5, max_fps: int = 60):
+        self.step = step
+        self.max_steps = max_steps
+        self.max_fps = max_fps
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0
+        self.last_time = None
+
+    def advance(self, update):
+        # runs every physics step that is due, returns how far into the next one we are
+        current_time = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = current_time
+        self.accumulator += current_time - self.last_time
+        self.last_time = current_time
+
+        steps = 0
+        while self.accumulator >= self.step:
+            # drop the backlog instead of spiralling further behind
+            if steps >= self.max_steps:
+                self.accumulator %= self.step
+                break
+            update(self.step)
+            self.accumulator -= self.step
+            steps += 1
+        return self.accumulator / self.step
+
+    def run(self, handle_events, update, render):
+        while True:
+            PROFILER.begin_frame()
+            if not handle_events():
+                break
+            render(self.advance(update))
+            PROFILER.end_frame()
+            # tick sleeps off the rest of the frame instead of spinning
+            self.clock.tick(self.max_fps)
@@ -0,0 +1,107 @@
+import pygame
+import struct
+from array import array
+
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+KEY_INPUTS = {
+    pygame.K_a: INPUT_LEFT,
+    pygame.K_LEFT: INPUT_LEFT,
+    pygame.K_d: INPUT_RIGHT,
+    pygame.K_RIGHT: INPUT_RIGHT,
+    pygame.K_w: INPUT_UP,
+    pygame.K_UP: INPUT_UP,
+    pygame.K_s: INPUT_DOWN,
+    pygame.K_DOWN: INPUT_DOWN,
+}
+
+# magic, version, frame count, followed by one input byte per physics step
+RECORDING_HEADER = struct.Struct("<4sII")
+RECORDING_MAGIC = b"PYIN"
+RECORDING_VERSION = 1
+
+
+def get_input_mask(keys):
+    mask = 0
+    for key, bit in KEY_INPUTS.items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+class InputKeys:
+    # looks like pygame.key.get_pressed() but only knows one step's input mask
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        self.mask = mask
+
+    def __getitem__(self, key: int):
+        return self.mask & KEY_INPUTS.get(key, 0)
+
+
+class KeyboardSource:
+    def __init__(self):
+        self.keys = InputKeys()
+
+    def poll(self):
+        # sources are polled once per physics step, not once per rendered frame
+        self.keys.mask = get_input_mask(pygame.key.get_pressed())
+        return self.keys
+
+
+class InputRecorder:
+    def __init__(self, source):
+        self.source = source
+        self.masks = array("B")
+
+    def poll(self):
+        keys = self.source.poll()
+        self.masks.append(keys.mask)
+        return keys
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(
+                RECORDING_HEADER.pack(
+                    RECORDING_MAGIC, RECORDING_VERSION, len(self.masks)
+                )
+            )
+            file.write(self.masks.tobytes())
+
+
+class ReplaySource:
+    def __init__(self, masks: array, loop: bool = False):
+        self.masks = masks
+        self.loop = loop
+        self.frame = 0
+        self.keys = InputKeys()
+
+    @classmethod
+    def load(cls, path: str, loop: bool = False):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, frames = RECORDING_HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{path} is not a version {RECORDING_VERSION} recording")
+        masks = array("B")
+        masks.frombytes(
+            data[RECORDING_HEADER.size : RECORDING_HEADER.size + frames]
+        )
+        return cls(masks, loop)
+
+    def poll(self):
+        # nothing is held once a recording runs out, unless it loops
+        if self.frame >= len(self.masks) and self.loop:
+            self.frame = 0
+        if self.frame < len(self.masks):
+            self.keys.mask = self.masks[self.frame]
+        else:
+            self.keys.mask = 0
+        self.frame += 1
+        return self.keys
+
+    def is_done(self):
+        return not self.loop and self.frame >= len(self.masks)
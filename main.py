@@ -1,9 +1,16 @@
 import pygame
-import time
+import argparse
 import os
 from sys import exit
 from player import Player
-from animator import Animator
+from animator import AnimationScheduler
+from manifest import Animations
+from collider import Collider
+from game_loop import GameLoop
+from renderer import DirtyRenderer
+from profiler import PROFILER
+from camera import Camera
+from input_source import InputRecorder, KeyboardSource, ReplaySource
 
 WIDTH = 1280
 HEIGHT = 720
@@ -31,47 +38,72 @@ PALLETTE = {
 
 
 def main():
+    parser = argparse.ArgumentParser(description="platformer test")
+    parser.add_argument("--record", help="save every physics step's input here")
+    parser.add_argument("--replay", help="play back a recording instead of the keys")
+    args = parser.parse_args()
+
     pygame.init()
     display = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Platformer Test")
-    clock = pygame.time.Clock()
 
-    test_surface = pygame.Surface((320, 180))
+    renderer = DirtyRenderer(display, (320, 180), (255, 241, 232))
 
     player_scale = 1
-    player_animator = Animator(100)
-    player_animator.init_state("Idle", "Triangle_Man_Sprites.png", 0, 8, 18, 16, 17)
-    player_animator.init_state("Run", "Triangle_Man_Sprites.png", 0, 0, 8, 16, 17)
-    player_animator.init_state(
-        "Transition", "Triangle_Man_Sprites.png", 0, 22, 23, 16, 17
-    )
-    player_animator.init_state("Jump", "Triangle_Man_Sprites.png", 0, 18, 21, 16, 17)
-    player_animator.init_state("Land", "Triangle_Man_Sprites.png", 0, 21, 22, 16, 17)
+    player_animations = Animations.load("Triangle_Man.json", "Triangle_Man.atlas")
+    player_animator = player_animations.create_animator("Idle")
+    scheduler = AnimationScheduler()
+    scheduler.add(player_animator)
     p1 = Player((0, 0), 12, 14, player_animator, "Idle")
-    p1.animator.current_state = "Idle"
-    p1.animator.last_state = "Idle"
-    p1.animator.requested_state = ["Idle", False, 0, 0, []]
+    colliders = [Collider((0, 150), 320, 30)]
+    entities = [p1]
+
+    camera = Camera((320, 180))
+    camera.snap_to(p1.rect.center)
 
-    last_time = time.time()
+    game_loop = GameLoop(1 / 60, 5, 60)
 
-    while True:
-        dt = time.time() - last_time
-        last_time = time.time()
+    replay = ReplaySource.load(args.replay) if args.replay else None
+    input_source = replay or KeyboardSource()
+    if args.record:
+        input_source = InputRecorder(input_source)
 
+    def handle_events():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
-
-        display.fill((255, 241, 232))
-
-        p1.update(dt, 400, 600)
-        p1.draw(display, pygame.Vector2())
-        # camera.draw(display, p1.position, test_level, p1, 3)
-
-        pygame.display.update()
+                if event.key == pygame.K_F3:
+                    PROFILER.toggle()
+        # a replay quits once it runs out of input
+        if replay is not None and replay.is_done():
+            return False
+        return True
+
+    def update(dt: float):
+        # input is read per step so a recording replays step for step
+        p1.keys = input_source.poll()
+        scheduler.update(dt)
+        p1.update(dt, 400, colliders)
+        camera.follow(p1.rect.center, dt)
+
+    def render(alpha: float):
+        PROFILER.restart()
+        renderer.begin(camera.get_offset(alpha))
+
+        camera.draw(renderer, colliders, alpha)
+        camera.draw(renderer, entities, alpha)
+        PROFILER.mark("draw")
+
+        renderer.draw(PROFILER)
+        renderer.present()
+        PROFILER.mark("present")
+
+    game_loop.run(handle_events, update, render)
+    if args.record:
+        input_source.save(args.record)
 
 
 """------------- Main -------------"""
@@ -0,0 +1,210 @@
+import pygame
+import json
+import mmap
+import os
+import struct
+import sys
+from animator import (
+    FLIPS,
+    Animator,
+    TransitionTable,
+    get_frame_area,
+    get_frame_mask,
+    load_animation,
+)
+
+BAKED_MAGIC = b"PYAT"
+BAKED_VERSION = 1
+# magic, version, atlas width, atlas height, frame table size
+BAKED_HEADER = struct.Struct("<4sIIII")
+
+
+def read_manifest(manifest_path: str):
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+    # sheet paths are relative to the manifest
+    root = os.path.dirname(manifest_path)
+    for sheet in manifest["sheets"].values():
+        sheet["path"] = os.path.join(root, sheet["path"])
+    return manifest
+
+
+def is_baked_current(manifest_path: str, baked_path: str):
+    # the baked atlas is only trusted while it is newer than its manifest and
+    # every sheet the manifest cuts frames from
+    if not os.path.exists(baked_path):
+        return False
+    sheets = read_manifest(manifest_path)["sheets"]
+    sources = [manifest_path] + [sheet["path"] for sheet in sheets.values()]
+    baked_time = os.path.getmtime(baked_path)
+    for source in sources:
+        if not os.path.exists(source) or os.path.getmtime(source) > baked_time:
+            return False
+    return True
+
+
+def create_table(states: list[dict]):
+    table = TransitionTable()
+    for state in states:
+        table.add_state(
+            state["name"],
+            state.get("hold", False),
+            state.get("num_frames", 0),
+            state.get("interrupt", False),
+            state.get("interrupt_states", ()),
+        )
+    return table
+
+
+class Animations:
+    def __init__(self, cooldown: int, table: TransitionTable):
+        self.cooldown = cooldown
+        self.table = table
+        self.animation_index = {}
+        self.frame_areas = {}
+        self.flipped_index = {}
+        self.mask_index = {}
+        self.buffer = None
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str):
+        manifest = read_manifest(manifest_path)
+        table = create_table(manifest["states"])
+        animations = cls(manifest.get("cooldown", 100), table)
+        for state in manifest["states"]:
+            sheet = manifest["sheets"][state["sheet"]]
+            color_key = sheet.get("color_key", (0, 0, 0))
+            frames = load_animation(
+                sheet["path"],
+                state["row"],
+                state["col"],
+                state["stop"],
+                sheet["width"],
+                sheet["height"],
+                tuple(color_key) if color_key is not None else None,
+            )
+            animations.add_state(state["name"], frames)
+        return animations
+
+    @classmethod
+    def from_baked(cls, baked_path: str):
+        # one read of the whole file, the atlas pixels are used straight from the map
+        with open(baked_path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, height, table_size = BAKED_HEADER.unpack_from(data)
+        if magic != BAKED_MAGIC or version != BAKED_VERSION:
+            raise ValueError(f"{baked_path} is not a version {BAKED_VERSION} atlas")
+        table_end = BAKED_HEADER.size + table_size
+        frame_table = json.loads(data[BAKED_HEADER.size : table_end])
+        atlas = pygame.image.frombuffer(
+            memoryview(data)[table_end : table_end + width * height * 4],
+            (width, height),
+            "RGBA",
+        )
+
+        animations = cls(frame_table["cooldown"], create_table(frame_table["states"]))
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        else:
+            # the atlas still points into the map, so it has to stay open
+            animations.buffer = data
+        for state in frame_table["states"]:
+            animations.add_state(
+                state["name"], [atlas.subsurface(rect) for rect in state["frames"]]
+            )
+        return animations
+
+    @classmethod
+    def load(cls, manifest_path: str, baked_path: str):
+        if is_baked_current(manifest_path, baked_path):
+            return cls.from_baked(baked_path)
+        return cls.from_manifest(manifest_path)
+
+    def add_state(self, state: str, frames: list[pygame.Surface]):
+        self.animation_index[state] = frames
+        self.frame_areas[state] = [get_frame_area(frame) for frame in frames]
+        self.mask_index[(state, False, False)] = [
+            get_frame_mask(frame) for frame in frames
+        ]
+        # flipped frames and their masks are built here, never mid-game
+        for flip in FLIPS:
+            flipped = [pygame.transform.flip(frame, *flip) for frame in frames]
+            self.flipped_index[(state, *flip)] = flipped
+            self.mask_index[(state, *flip)] = [
+                get_frame_mask(frame) for frame in flipped
+            ]
+
+    def create_animator(self, start_state: str, table: TransitionTable = None):
+        # animators share the frame tables, only their state is their own
+        animator = Animator(self.cooldown)
+        animator.animation_index = self.animation_index
+        animator.frame_areas = self.frame_areas
+        animator.flipped_index = self.flipped_index
+        animator.mask_index = self.mask_index
+        animator.set_table(table or self.table, start_state)
+        return animator
+
+
+def pack_frames(frames: list[pygame.Surface], max_width: int = 1024):
+    # simple shelf packing, frames are laid left to right and wrap onto a new shelf
+    x = y = shelf_height = width = 0
+    rects = []
+    for frame in frames:
+        frame_width, frame_height = frame.get_size()
+        if x + frame_width > max_width and x > 0:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        rects.append(pygame.Rect(x, y, frame_width, frame_height))
+        x += frame_width
+        width = max(width, x)
+        shelf_height = max(shelf_height, frame_height)
+    return rects, (width, y + shelf_height)
+
+
+def bake(manifest_path: str, baked_path: str):
+    manifest = read_manifest(manifest_path)
+    animations = Animations.from_manifest(manifest_path)
+    frames = [
+        frame
+        for state in manifest["states"]
+        for frame in animations.animation_index[state["name"]]
+    ]
+    rects, size = pack_frames(frames)
+    # colour keys are baked into alpha so every sheet shares one pixel format
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for frame, rect in zip(frames, rects):
+        atlas.blit(frame, rect)
+
+    states = []
+    rects = iter(rects)
+    for state in manifest["states"]:
+        frame_count = len(animations.animation_index[state["name"]])
+        states.append(
+            {
+                "name": state["name"],
+                "hold": state.get("hold", False),
+                "num_frames": state.get("num_frames", 0),
+                "interrupt": state.get("interrupt", False),
+                "interrupt_states": state.get("interrupt_states", []),
+                "frames": [list(next(rects)) for _ in range(frame_count)],
+            }
+        )
+    frame_table = json.dumps(
+        {"cooldown": manifest.get("cooldown", 100), "states": states}
+    ).encode()
+
+    with open(baked_path, "wb") as file:
+        file.write(
+            BAKED_HEADER.pack(BAKED_MAGIC, BAKED_VERSION, *size, len(frame_table))
+        )
+        file.write(frame_table)
+        file.write(pygame.image.tobytes(atlas, "RGBA"))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python manifest.py <manifest.json> <output.atlas>")
+        sys.exit(1)
+    bake(sys.argv[1], sys.argv[2])
@@ -0,0 +1,341 @@
+import numpy as np
+import pygame
+
+
+class BodyVector:
+    # stands in for a Collider's Vector2 but reads and writes a row of a world array
+    def __init__(self, body, array_name: str):
+        self.body = body
+        self.array_name = array_name
+
+    def get_row(self):
+        return getattr(self.body.world, self.array_name)[self.body.index]
+
+    @property
+    def x(self):
+        return float(self.get_row()[0])
+
+    @x.setter
+    def x(self, value: float):
+        self.get_row()[0] = value
+
+    @property
+    def y(self):
+        return float(self.get_row()[1])
+
+    @y.setter
+    def y(self, value: float):
+        self.get_row()[1] = value
+
+    def update(self, x: float, y: float = None):
+        # like Vector2.update, takes two floats or anything with two items
+        row = self.get_row()
+        if y is None:
+            row[0], row[1] = x
+        else:
+            row[0], row[1] = x, y
+
+    def get_vector(self):
+        return pygame.Vector2(float(self.get_row()[0]), float(self.get_row()[1]))
+
+    def copy(self):
+        return self.get_vector()
+
+    def lerp(self, other, t: float):
+        return self.get_vector().lerp(tuple(other), t)
+
+    # arithmetic returns plain Vector2s, in place forms write back to the world
+    def __add__(self, other):
+        return self.get_vector() + tuple(other)
+
+    def __radd__(self, other):
+        return self.get_vector() + tuple(other)
+
+    def __sub__(self, other):
+        return self.get_vector() - tuple(other)
+
+    def __rsub__(self, other):
+        return pygame.Vector2(tuple(other)) - self.get_vector()
+
+    def __mul__(self, value: float):
+        return self.get_vector() * value
+
+    def __rmul__(self, value: float):
+        return self.get_vector() * value
+
+    def __truediv__(self, value: float):
+        return self.get_vector() / value
+
+    def __neg__(self):
+        return -self.get_vector()
+
+    def __iadd__(self, other):
+        row = self.get_row()
+        x, y = other
+        row[0] += x
+        row[1] += y
+        return self
+
+    def __isub__(self, other):
+        row = self.get_row()
+        x, y = other
+        row[0] -= x
+        row[1] -= y
+        return self
+
+    def __imul__(self, value: float):
+        self.get_row()[:] *= value
+        return self
+
+    def __eq__(self, other):
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __getitem__(self, index: int):
+        return float(self.get_row()[index])
+
+    def __setitem__(self, index: int, value: float):
+        self.get_row()[index] = value
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return f"BodyVector({self.x}, {self.y})"
+
+
+class BodyRect:
+    # a live view of a body's bounds, moving it moves the body and resizing it
+    # resizes the body, the position is rounded the same way Collider rounds it
+    def __init__(self, body):
+        self.body = body
+
+    @property
+    def rect(self):
+        # pygame functions take any object with a rect attribute as a rect
+        x, y = self.body.world.positions[self.body.index]
+        return pygame.Rect((round(x), round(y)), self.size)
+
+    @property
+    def x(self):
+        return round(self.body.world.positions[self.body.index][0])
+
+    @x.setter
+    def x(self, value: int):
+        self.body.world.positions[self.body.index][0] = value
+
+    @property
+    def y(self):
+        return round(self.body.world.positions[self.body.index][1])
+
+    @y.setter
+    def y(self, value: int):
+        self.body.world.positions[self.body.index][1] = value
+
+    @property
+    def width(self):
+        return int(self.body.world.sizes[self.body.index][0])
+
+    @width.setter
+    def width(self, value: int):
+        self.body.world.sizes[self.body.index][0] = value
+
+    @property
+    def height(self):
+        return int(self.body.world.sizes[self.body.index][1])
+
+    @height.setter
+    def height(self, value: int):
+        self.body.world.sizes[self.body.index][1] = value
+
+    left = x
+    top = y
+    w = width
+    h = height
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @right.setter
+    def right(self, value: int):
+        self.x = value - self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @bottom.setter
+    def bottom(self, value: int):
+        self.y = value - self.height
+
+    @property
+    def topleft(self):
+        return self.x, self.y
+
+    @topleft.setter
+    def topleft(self, value: tuple):
+        self.x, self.y = value
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @size.setter
+    def size(self, value: tuple):
+        self.width, self.height = value
+
+    @property
+    def center(self):
+        return self.rect.center
+
+    @center.setter
+    def center(self, value: tuple):
+        self.x = value[0] - self.width // 2
+        self.y = value[1] - self.height // 2
+
+    def update(self, *rect):
+        self.body.rect = pygame.Rect(*rect)
+
+    def move(self, x: int, y: int):
+        return self.rect.move(x, y)
+
+    def copy(self):
+        return self.rect
+
+    def colliderect(self, other):
+        return self.rect.colliderect(other)
+
+    def __eq__(self, other):
+        return self.rect == other
+
+    def __repr__(self):
+        return f"BodyRect{tuple(self.rect)}"
+
+
+class Body:
+    def __init__(self, world, index: int):
+        self.world = world
+        self.index = index
+        self.position_view = BodyVector(self, "positions")
+        self.velocity_view = BodyVector(self, "velocities")
+        self.rect_view = BodyRect(self)
+
+    # assigning a new vector or rect copies it into the world instead of
+    # replacing the view, so Collider style code keeps writing to the arrays
+    @property
+    def position(self):
+        return self.position_view
+
+    @position.setter
+    def position(self, value: pygame.Vector2):
+        self.position_view.update(value)
+
+    @property
+    def velocity(self):
+        return self.velocity_view
+
+    @velocity.setter
+    def velocity(self, value: pygame.Vector2):
+        self.velocity_view.update(value)
+
+    @property
+    def gravity_mul(self):
+        return float(self.world.gravity_muls[self.index])
+
+    @gravity_mul.setter
+    def gravity_mul(self, value: float):
+        self.world.gravity_muls[self.index] = value
+
+    @property
+    def max_fall(self):
+        return float(self.world.max_falls[self.index])
+
+    @max_fall.setter
+    def max_fall(self, value: float):
+        self.world.max_falls[self.index] = value
+
+    @property
+    def rect(self):
+        return self.rect_view
+
+    @rect.setter
+    def rect(self, value: pygame.Rect):
+        value = pygame.Rect(value)
+        self.world.positions[self.index] = value.topleft
+        self.world.sizes[self.index] = value.size
+
+
+class PhysicsWorld:
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self.bodies = []
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.sizes = np.zeros((capacity, 2), dtype=np.int32)
+        self.gravity_muls = np.ones(capacity)
+        self.max_falls = np.zeros(capacity)
+
+    def grow(self):
+        capacity = max(len(self.positions) * 2, 1)
+        for name in ("positions", "velocities", "sizes", "gravity_muls", "max_falls"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
+
+    def add(
+        self,
+        position: pygame.Vector2,
+        width: int,
+        height: int,
+        max_fall: float = 250,
+        gravity_mul: float = 1,
+    ):
+        if self.count == len(self.positions):
+            self.grow()
+        index = self.count
+        self.positions[index] = position
+        self.velocities[index] = (0, 0)
+        self.sizes[index] = (width, height)
+        self.gravity_muls[index] = gravity_mul
+        self.max_falls[index] = max_fall
+        body = Body(self, index)
+        self.bodies.append(body)
+        self.count += 1
+        return body
+
+    def remove(self, body: Body):
+        # the last body is moved into the gap so the arrays stay packed
+        last = self.count - 1
+        index = body.index
+        if index != last:
+            for array in (
+                self.positions,
+                self.velocities,
+                self.sizes,
+                self.gravity_muls,
+                self.max_falls,
+            ):
+                array[index] = array[last]
+            self.bodies[index] = self.bodies[last]
+            self.bodies[index].index = index
+        self.bodies.pop()
+        self.count = last
+        body.index = None
+
+    def apply_gravity(self, dt: float, gravity: float):
+        n = self.count
+        velocity_y = self.velocities[:n, 1]
+        velocity_y += gravity * self.gravity_muls[:n] * dt
+        np.minimum(velocity_y, self.max_falls[:n], out=velocity_y)
+
+    def step(self, dt: float, gravity: float):
+        self.apply_gravity(dt, gravity)
+        n = self.count
+        self.positions[:n] += self.velocities[:n] * dt
@@ -1,7 +1,22 @@
 import pygame
-from animator import Animator, State
+import struct
+from animator import ANIMATOR_STATE, Animator, TransitionTable
 from collider import Collider
+from spatial_hash import SpatialHash
+from tilemap import TileMap
 from general_funcs import limit_range, map_range
+from profiler import PROFILER
+
+# fallback rules for animators that weren't built with a table of their own
+PLAYER_TRANSITIONS = TransitionTable()
+PLAYER_TRANSITIONS.add_state("Idle")
+PLAYER_TRANSITIONS.add_state("Run")
+PLAYER_TRANSITIONS.add_state("Jump", True, 1)
+PLAYER_TRANSITIONS.add_state("Land", True, 3, True, ["Run"])
+PLAYER_TRANSITIONS.add_state("Transition", True, 2, True, ["Run", "Jump"])
+
+# accel, gravity_mul, air_time, direction, last_input and the jump and facing flags
+PLAYER_STATE = struct.Struct("<2di4b4?")
 
 
 class Player(Collider):
@@ -11,18 +26,29 @@ class Player(Collider):
         width: int,
         height: int,
         animator: Animator,
-        start_state: State,
+        start_state: str,
     ):
-        super().__init__(position, width, height, *groups)
-        self.image = animator.animation_index[start_state.state][0]
+        super().__init__(position, width, height)
+        self.image = animator.animation_index[start_state][0]
         self.rect = pygame.Rect(position, (width, height))
 
         self.animator = animator
-        self.last_state = self.start_state
+        # a table from a manifest or baked atlas keeps its own rules
+        self.animator.set_table(animator.table or PLAYER_TRANSITIONS, start_state)
+        ids = animator.table.ids
+        self.state_ids = (
+            ids["Idle"],
+            ids["Run"],
+            ids["Jump"],
+            ids["Land"],
+            ids["Transition"],
+        )
+        self.last_state = start_state
 
         self.position = pygame.Vector2(position)
+        self.last_position = pygame.Vector2(position)
         self.velocity = pygame.Vector2()
-        self.accel = pygame.Vector2()
+        self.accel = 0
         self.direction = pygame.Vector2()
         self.last_input = pygame.Vector2()
 
@@ -36,10 +62,56 @@ class Player(Collider):
         self.on_ground = False
         self.has_jump = False
         self.flipped = False
+        self.swept = True
+        # scripted key state for headless runs, the keyboard is read when None
+        self.keys = None
+
+    def get_state_size(self):
+        return super().get_state_size() + PLAYER_STATE.size + ANIMATOR_STATE.size
+
+    def pack_state(self, buffer: bytearray, offset: int = 0):
+        offset = super().pack_state(buffer, offset)
+        PLAYER_STATE.pack_into(
+            buffer,
+            offset,
+            self.accel,
+            self.gravity_mul,
+            self.air_time,
+            int(self.direction.x),
+            int(self.direction.y),
+            int(self.last_input.x),
+            int(self.last_input.y),
+            self.jump_released,
+            self.on_ground,
+            self.has_jump,
+            self.flipped,
+        )
+        return self.animator.pack_state(buffer, offset + PLAYER_STATE.size)
+
+    def unpack_state(self, buffer: bytearray, offset: int = 0):
+        offset = super().unpack_state(buffer, offset)
+        (
+            self.accel,
+            self.gravity_mul,
+            self.air_time,
+            direction_x,
+            direction_y,
+            last_input_x,
+            last_input_y,
+            self.jump_released,
+            self.on_ground,
+            self.has_jump,
+            self.flipped,
+        ) = PLAYER_STATE.unpack_from(buffer, offset)
+        self.direction.update(direction_x, direction_y)
+        self.last_input.update(last_input_x, last_input_y)
+        offset = self.animator.unpack_state(buffer, offset + PLAYER_STATE.size)
+        self.image = self.animator.get_frame(self.flipped, False)
+        return offset
 
     def get_input(self):
-        keys = pygame.key.get_pressed()
-        self.direction = pygame.Vector2()
+        keys = self.keys if self.keys is not None else pygame.key.get_pressed()
+        self.direction.update(0, 0)
         if keys[pygame.K_a] or keys[pygame.K_LEFT]:
             self.direction.x = -1
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
@@ -79,9 +151,17 @@ class Player(Collider):
             self.gravity_mul = 1.75
 
     def handle_collisions(
-        self, dt: float, colliders: list[pygame.sprite.Sprite], tolerance: float
+        self,
+        dt: float,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
+        tolerance: float,
     ):
-        collision_types = self.check_collisions(dt, colliders)
+        if self.swept:
+            # the sweep leaves the player flush against what it hit, no nudge needed
+            collision_types = self.sweep_collisions(dt, colliders)
+            tolerance = 0
+        else:
+            collision_types = self.check_collisions(dt, colliders)
         if collision_types[1]:
             self.on_ground = True
             self.has_jump = True
@@ -100,36 +180,85 @@ class Player(Collider):
             self.position.x = self.rect.x + (tolerance * self.direction.x)
 
     def set_animation(self):
+        animator = self.animator
+        idle, run, jump, land, transition = self.state_ids
         if self.velocity.x == 0 and self.on_ground:
-            self.animator.request_state("Idle", 0, False, 0, False, [])
+            animator.request(idle)
         if self.velocity.x != 0 and self.on_ground:
-            self.animator.request_state("Run", 0, False, 0, False, [])
+            animator.request(run)
         if not self.on_ground:
-            self.animator.request_state("Jump", min(round(map_range(self.velocity.y, self.max_fall, self.jump_force, 3)), 2), True, 1, False, [])
-        if self.animator.last_state.state == "Jump" and self.animator.last_state.state != "Jump":
-            self.animator.request_state("Land", 0, True, 3, True, ["Run"])
-        if self.animator.last_state.state != "Transition" and self.animator.last_state.state != "Idle" and self.animator.request_state.state == "Idle":
-            self.animator.request_state("Transition", 0, True, 2, True, ["Run", "Jump"])
+            animator.request(
+                jump,
+                min(
+                    round(
+                        map_range(self.velocity.y, self.max_fall, self.jump_force, 3)
+                    ),
+                    2,
+                ),
+            )
+        # compared with the running state, last_state still reads Jump while Land
+        # plays and would queue Land again behind itself
+        current_id = animator.current_state.state_id
+        if current_id == jump and animator.requested_id != jump:
+            animator.request(land)
+        if (
+            current_id != transition
+            and current_id != idle
+            and animator.requested_id == idle
+        ):
+            animator.request(transition)
+        if self.velocity.x < 0:
+            self.flipped = True
+        if self.velocity.x > 0:
+            self.flipped = False
 
-    def update(self, dt: float, gravity: float, min_pos: int):
+    def update(
+        self,
+        dt: float,
+        gravity: float,
+        colliders: list[pygame.sprite.Sprite] | SpatialHash | TileMap,
+    ):
+        PROFILER.restart()
+        self.save_position()
         self.get_input()
+        PROFILER.mark("input")
         self.apply_gravity(dt, gravity, self.max_fall, self.gravity_mul)
+        PROFILER.mark("gravity")
         self.handle_input(dt)
-        self.handle_collisions(dt, min_pos, 0.25)
+        PROFILER.mark("handle input")
+        self.handle_collisions(dt, colliders, 0.25)
+        PROFILER.mark("collisions")
         self.set_animation()
-        self.animator.update_frame()
-        self.image = self.animator.get_frame()
-
-    def draw(self, surface: pygame.Surface, offset: pygame.Vector2):
-        p_img = pygame.transform.flip(self.image, self.flipped, False)
-        img_pos = (
-            pygame.Vector2(
-                self.position.x - (p_img.get_width() - self.rect.width) * 0.5,
-                self.position.y - (p_img.get_height() - self.rect.height),
-            )
-            - offset
+        PROFILER.mark("set animation")
+        if not self.animator.scheduled:
+            self.animator.update()
+        self.image = self.animator.get_frame(self.flipped, False)
+        PROFILER.mark("get frame")
+
+    def get_mask(self):
+        return self.animator.get_mask(self.flipped, False)
+
+    def get_mask_position(self):
+        # lined up with the image the same way draw places it
+        width, height = self.image.get_size()
+        return (
+            round(self.rect.x - (width - self.rect.width) * 0.5),
+            self.rect.bottom - height,
+        )
+
+    def draw(self, surface: pygame.Surface, offset: pygame.Vector2, alpha: float = 1):
+        p_img = self.image
+        # interpolated by hand, lerp would allocate a Vector2 every draw
+        last_position = self.last_position
+        x = last_position.x + (self.position.x - last_position.x) * alpha
+        y = last_position.y + (self.position.y - last_position.y) * alpha
+        return surface.blit(
+            p_img,
+            (
+                round(x - (p_img.get_width() - self.rect.width) * 0.5 - offset[0]),
+                round(y - (p_img.get_height() - self.rect.height) - offset[1]),
+            ),
         )
-        surface.blit(p_img, (round(img_pos.x), round(img_pos.y)))
 
 
 # class Player(Collider):
@@ -0,0 +1,104 @@
+import pygame
+import time
+from array import array
+
+
+class Profiler:
+    def __init__(self, size: int = 120):
+        self.enabled = False
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.last_mark = 0
+        self.frame_start = 0
+        # phase timings and frame times live in fixed-size ring buffers
+        self.timings = {}
+        self.frame_times = array("d", bytes(8 * size))
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        for buffer in self.timings.values():
+            buffer[self.index] = 0
+
+    def restart(self):
+        # stops whatever ran since the last mark from being charged to the next phase
+        if not self.enabled:
+            return
+        self.last_mark = time.perf_counter()
+
+    def mark(self, phase: str):
+        # charges the time since the last mark to phase
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        buffer = self.timings.get(phase)
+        if buffer is None:
+            buffer = self.timings[phase] = array("d", bytes(8 * self.size))
+        buffer[self.index] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame_times[self.index] = time.perf_counter() - self.frame_start
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def get_average(self, buffer: array):
+        return sum(buffer) / self.count if self.count else 0
+
+    def get_peak(self, buffer: array):
+        return max(buffer) if self.count else 0
+
+    def draw(self, surface: pygame.Surface, position: tuple = (0, 0)):
+        if not self.enabled:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(None, 12)
+
+        lines = [
+            f"{phase} {self.get_average(buffer) * 1000:.2f} "
+            f"({self.get_peak(buffer) * 1000:.2f}) ms"
+            for phase, buffer in self.timings.items()
+        ]
+        lines.append(
+            f"frame {self.get_average(self.frame_times) * 1000:.2f} "
+            f"({self.get_peak(self.frame_times) * 1000:.2f}) ms"
+        )
+        x, y = position
+        line_height = self.font.get_linesize()
+        graph_height = 24
+        rect = pygame.Rect(
+            position, (self.size, line_height * len(lines) + graph_height)
+        )
+        surface.fill((0, 0, 0), rect)
+        for i, line in enumerate(lines):
+            surface.blit(
+                self.font.render(line, False, (255, 241, 232)),
+                (x + 1, y + i * line_height),
+            )
+
+        # one bar per frame, oldest on the left, the line marks a 60 fps budget
+        bottom = rect.bottom - 1
+        scale = graph_height / (1 / 30)
+        for i in range(self.count):
+            frame_time = self.frame_times[(self.index - self.count + i) % self.size]
+            bar_height = min(round(frame_time * scale), graph_height)
+            color = (255, 0, 77) if frame_time > 1 / 60 else (0, 135, 81)
+            pygame.draw.line(
+                surface, color, (x + i, bottom), (x + i, bottom - bar_height)
+            )
+        budget_y = bottom - round(scale / 60)
+        pygame.draw.line(
+            surface, (255, 236, 39), (x, budget_y), (rect.right - 1, budget_y)
+        )
+        return rect
+
+
+PROFILER = Profiler()
@@ -0,0 +1,179 @@
+import pygame
+
+
+def get_atlas_key(item: tuple):
+    # frames cut from the same sheet share a parent, blitting them together keeps
+    # the source pixels hot
+    image = item[0]
+    return id(image.get_parent() or image)
+
+
+class RenderQueue:
+    def __init__(self, surface: pygame.Surface):
+        self.surface = surface
+        self.layer = 0
+        self.layers = {}
+
+    def blit(self, image: pygame.Surface, position: tuple):
+        # stands in for a surface so entity draw methods can be queued unchanged
+        items = self.layers.get(self.layer)
+        if items is None:
+            items = self.layers[self.layer] = []
+        items.append((image, position))
+        return pygame.Rect(position, image.get_size())
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    def get_size(self):
+        return self.surface.get_size()
+
+    def flush(self):
+        # one blits call per layer instead of one blit per sprite
+        for layer in sorted(self.layers):
+            items = self.layers[layer]
+            if not items:
+                continue
+            items.sort(key=get_atlas_key)
+            self.surface.blits(items, False)
+            items.clear()
+
+
+class Renderer:
+    def __init__(self, display: pygame.Surface, native_size: tuple):
+        self.display = display
+        self.surface = pygame.Surface(native_size)
+        self.queue = RenderQueue(self.surface)
+        self.resize()
+
+    def resize(self):
+        # picks the largest whole-number scale that fits and centres it on the display
+        native_w, native_h = self.surface.get_size()
+        display_w, display_h = self.display.get_size()
+        self.scale = max(min(display_w // native_w, display_h // native_h), 1)
+        scaled_size = (
+            min(native_w * self.scale, display_w),
+            min(native_h * self.scale, display_h),
+        )
+        self.screen_rect = pygame.Rect((0, 0), scaled_size)
+        self.screen_rect.center = self.display.get_rect().center
+        # scaling straight into a view of the display skips a per-frame surface
+        self.target = self.display.subsurface(self.screen_rect)
+        self.display.fill((0, 0, 0))
+
+    def world_to_screen(self, position: pygame.Vector2, offset: pygame.Vector2):
+        return (
+            pygame.Vector2(position) - offset
+        ) * self.scale + self.screen_rect.topleft
+
+    def screen_to_world(self, position: pygame.Vector2, offset: pygame.Vector2):
+        return (
+            pygame.Vector2(position) - self.screen_rect.topleft
+        ) / self.scale + offset
+
+    def submit(self, entity: pygame.sprite.Sprite, *args, layer: int = 0):
+        self.queue.layer = layer
+        return entity.draw(self.queue, *args)
+
+    def draw(self, entity: pygame.sprite.Sprite, *args):
+        # anything drawn straight to the surface has to land on top of the queue
+        self.queue.flush()
+        return entity.draw(self.surface, *args)
+
+    def present(self):
+        self.queue.flush()
+        if self.scale == 1:
+            self.target.blit(self.surface, (0, 0))
+        else:
+            pygame.transform.scale(self.surface, self.screen_rect.size, self.target)
+
+
+def merge_rects(rects: list[pygame.Rect]):
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer(Renderer):
+    def __init__(self, display: pygame.Surface, native_size: tuple, background: tuple):
+        self.background = background
+        self.last_rects = {}
+        self.rects = {}
+        self.last_offset = None
+        super().__init__(display, native_size)
+
+    def resize(self):
+        super().resize()
+        self.invalidate()
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def begin(self, offset: pygame.Vector2):
+        # scrolling moves everything on screen so only a full redraw is correct
+        if offset != self.last_offset:
+            self.last_offset = pygame.Vector2(offset)
+            self.invalidate()
+        if self.full_redraw:
+            self.surface.fill(self.background)
+        else:
+            for rect in self.last_rects.values():
+                self.surface.fill(self.background, rect)
+        self.rects = {}
+
+    def submit(self, entity: pygame.sprite.Sprite, *args, layer: int = 0):
+        rect = super().submit(entity, *args, layer=layer)
+        if rect is not None:
+            self.rects[entity] = rect
+
+    def draw(self, entity: pygame.sprite.Sprite, *args):
+        rect = super().draw(entity, *args)
+        if rect is not None:
+            self.rects[entity] = rect
+
+    def get_screen_rect(self, rect: pygame.Rect):
+        return pygame.Rect(
+            self.screen_rect.x + rect.x * self.scale,
+            self.screen_rect.y + rect.y * self.scale,
+            rect.width * self.scale,
+            rect.height * self.scale,
+        )
+
+    def present(self):
+        # queued sprites have to be on the surface before the dirty rects are read
+        self.queue.flush()
+        if self.full_redraw:
+            super().present()
+            pygame.display.flip()
+        else:
+            # entities are cleared where they were and redrawn where they are now
+            screen_rects = []
+            for rect in merge_rects(
+                list(self.last_rects.values()) + list(self.rects.values())
+            ):
+                rect = rect.clip(self.surface.get_rect())
+                if not rect:
+                    continue
+                if self.scale == 1:
+                    self.target.blit(self.surface, rect.topleft, rect)
+                    screen_rect = rect.move(self.screen_rect.topleft)
+                else:
+                    screen_rect = self.get_screen_rect(rect)
+                    pygame.transform.scale(
+                        self.surface.subsurface(rect),
+                        screen_rect.size,
+                        self.display.subsurface(screen_rect),
+                    )
+                screen_rects.append(screen_rect.clip(self.screen_rect))
+            pygame.display.update(screen_rects)
+        self.last_rects = self.rects
+        self.full_redraw = False
@@ -0,0 +1,51 @@
+from array import array
+from collider import Collider
+
+# anything with get_state_size, pack_state and unpack_state can be snapshotted,
+# colliders and players as well as the AnimationScheduler driving them
+
+
+def get_state_size(bodies: list[Collider]):
+    return sum(body.get_state_size() for body in bodies)
+
+
+def save_state(bodies: list[Collider], buffer: bytearray, offset: int = 0):
+    # bodies are written back to back in list order, the layout only depends on
+    # the list so a buffer is restored onto the same list it was saved from
+    for body in bodies:
+        offset = body.pack_state(buffer, offset)
+    return offset
+
+
+def restore_state(bodies: list[Collider], buffer: bytearray, offset: int = 0):
+    for body in bodies:
+        offset = body.unpack_state(buffer, offset)
+    return offset
+
+
+class SnapshotRing:
+    def __init__(self, bodies: list[Collider], size: int = 8):
+        self.bodies = bodies
+        self.size = size
+        # every slot is allocated up front, saving never allocates
+        self.frame_size = get_state_size(bodies)
+        self.buffer = bytearray(self.frame_size * size)
+        self.frames = array("q", [-1] * size)
+
+    def save(self, frame: int):
+        slot = frame % self.size
+        save_state(self.bodies, self.buffer, slot * self.frame_size)
+        self.frames[slot] = frame
+
+    def has_frame(self, frame: int):
+        return frame >= 0 and self.frames[frame % self.size] == frame
+
+    def restore(self, frame: int):
+        # older frames have been overwritten once the ring wraps
+        if not self.has_frame(frame):
+            raise KeyError(f"frame {frame} is not in the snapshot ring")
+        restore_state(self.bodies, self.buffer, frame % self.size * self.frame_size)
+
+    def clear(self):
+        for slot in range(self.size):
+            self.frames[slot] = -1
@@ -0,0 +1,73 @@
+import pygame
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        # cells map to dicts used as ordered sets so queries stay deterministic
+        self.cells = {}
+        self.object_cells = {}
+
+    def get_cells(self, rect: pygame.Rect):
+        # cells are packed into single ints, cheaper to build and hash than tuples
+        cs = self.cell_size
+        return tuple(
+            (x << 32) + y
+            for x in range(rect.left // cs, max(rect.right - 1, rect.left) // cs + 1)
+            for y in range(rect.top // cs, max(rect.bottom - 1, rect.top) // cs + 1)
+        )
+
+    def insert(self, obj: pygame.sprite.Sprite):
+        cells = self.get_cells(obj.rect)
+        self.object_cells[obj] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, {})[obj] = None
+
+    def remove(self, obj: pygame.sprite.Sprite):
+        for cell in self.object_cells.pop(obj, ()):
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, obj: pygame.sprite.Sprite):
+        # only rehash when the rect has crossed into different cells
+        if self.object_cells.get(obj) == self.get_cells(obj.rect):
+            return
+        self.remove(obj)
+        self.insert(obj)
+
+    def query(self, rect: pygame.Rect, found: list = None):
+        # walks the cells directly instead of building them, queries run every frame
+        # pass in a list to have it filled instead of allocating a new one
+        if found is None:
+            found = []
+        cs = self.cell_size
+        cells = self.cells
+        # while loops, nested ranges keep two ranges and their iterators alive
+        top = rect.top // cs
+        right = max(rect.right - 1, rect.left) // cs
+        bottom = max(rect.bottom - 1, rect.top) // cs
+        x = rect.left // cs
+        while x <= right:
+            y = top
+            while y <= bottom:
+                bucket = cells.get((x << 32) + y)
+                if bucket:
+                    for obj in bucket:
+                        # only a handful of objects come back, a scan beats a set
+                        if rect.colliderect(obj.rect) and obj not in found:
+                            found.append(obj)
+                y += 1
+            x += 1
+        return found
+
+    def clear(self):
+        self.cells = {}
+        self.object_cells = {}
+
+    def __contains__(self, obj: pygame.sprite.Sprite):
+        return obj in self.object_cells
+
+    def __len__(self):
+        return len(self.object_cells)
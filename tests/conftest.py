@@ -0,0 +1,21 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# assets are loaded relative to the repo root, like main.py expects
+os.chdir(ROOT)
+
+import pygame
+import pytest
+
+
+@pytest.fixture
+def display():
+    pygame.init()
+    display = pygame.display.set_mode((320, 180))
+    yield display
+    pygame.quit()
@@ -0,0 +1,28 @@
+import pygame
+import pytest
+from benchmark import AnimatedScenario, check_allocations, check_scenario_allocations
+from spatial_hash import SpatialHash
+
+
+@pytest.mark.parametrize("name", ["player", "colliders"])
+@pytest.mark.parametrize("frames", [60, 120])
+def test_scenario_stops_allocating(display, name, frames):
+    assert check_allocations(name, frames, 1 / 60) == []
+
+
+def test_animated_scenario_stops_allocating(display):
+    # a smaller crowd than the benchmark, the per-entity path is the same
+    scenario = AnimatedScenario(pygame.Surface((320, 180)), 200)
+    assert check_scenario_allocations(scenario, 60, 1 / 60) == []
+
+
+def test_check_flags_transient_allocations(display, monkeypatch):
+    query = SpatialHash.query
+
+    def copying_query(self, rect, found=None):
+        # the dict and list query used to build on every call, freed again
+        # within the step so only the per-step peak can see them
+        return list(dict.fromkeys(query(self, rect)))
+
+    monkeypatch.setattr(SpatialHash, "query", copying_query)
+    assert check_allocations("colliders", 60, 1 / 60)
@@ -0,0 +1,51 @@
+import pygame
+import pytest
+from animator import FLIPS, AnimationScheduler, Animator, draw_frames
+from manifest import Animations
+
+
+@pytest.mark.parametrize("cooldown", [0, -10])
+def test_scheduler_rejects_non_positive_cooldowns(cooldown):
+    scheduler = AnimationScheduler()
+    with pytest.raises(ValueError):
+        scheduler.add(Animator(cooldown))
+    assert not scheduler.buckets
+
+
+def test_draw_frames_matches_plain_blits(display):
+    animations = Animations.from_manifest("Triangle_Man.json")
+    animator = animations.create_animator("Run")
+    frames = [
+        (animator.get_frame(), (0, 0)),
+        (animator.get_frame(flip_x=True), (20, 0)),
+        (animator.get_flipped_frames("Idle", True, True)[3], (40, 10)),
+    ]
+    batched = pygame.Surface((80, 40))
+    batched.fill((255, 241, 232))
+    expected = batched.copy()
+    draw_frames(batched, frames)
+    for frame, position in frames:
+        expected.blit(frame, position)
+    assert pygame.image.tobytes(batched, "RGB") == pygame.image.tobytes(
+        expected, "RGB"
+    )
+
+
+def test_flipped_masks_are_built_up_front(display, monkeypatch):
+    animations = Animations.from_manifest("Triangle_Man.json")
+    animator = Animator(100)
+    animator.init_state("Run", "Triangle_Man_Sprites.png", 0, 0, 8, 16, 17)
+    manifest_animator = animations.create_animator("Run")
+
+    def fail(*args):
+        raise AssertionError("mask built during play")
+
+    monkeypatch.setattr(pygame.mask, "from_surface", fail)
+    monkeypatch.setattr(pygame.transform, "flip", fail)
+    for frames_from in (animator, manifest_animator):
+        for flip_x, flip_y in ((False, False), *FLIPS):
+            masks = frames_from.get_frame_masks("Run", flip_x, flip_y)
+            unflipped = frames_from.get_frame_masks("Run", False, False)
+            assert [mask.count() for mask in masks] == [
+                mask.count() for mask in unflipped
+            ]
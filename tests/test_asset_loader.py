@@ -0,0 +1,36 @@
+import time
+from animator import Animator
+from asset_loader import AssetLoader
+
+
+def wait_for(loader: AssetLoader):
+    for _ in range(500):
+        loader.poll()
+        if loader.is_done():
+            return
+        time.sleep(0.01)
+    raise AssertionError("loader never finished")
+
+
+def test_failed_load_does_not_stall_the_loader(display):
+    loader = AssetLoader(2)
+    errors = []
+    missing = loader.load_sheet("missing.png")
+    missing.on_error(errors.append)
+    animator = Animator(100)
+    ready = []
+    handle = loader.load_state(
+        animator, "Run", "Triangle_Man_Sprites.png", 0, 0, 8, 16, 17
+    )
+    handle.on_ready(ready.append)
+    wait_for(loader)
+    # later polls must not complete anything a second time
+    loader.poll()
+    loader.shutdown()
+
+    assert missing.error is not None and errors == [missing.error]
+    assert not missing.ready
+    assert loader.failed == [missing]
+    assert handle.ready and len(ready) == 1
+    assert len(animator.animation_index["Run"]) == 8
+    assert loader.get_progress() == 1
@@ -0,0 +1,14 @@
+from camera import Camera
+from collider import Collider
+from renderer import Renderer
+
+
+def test_camera_draws_plain_colliders(display):
+    renderer = Renderer(display, (320, 180))
+    renderer.surface.fill((255, 255, 255))
+    camera = Camera((320, 180))
+    colliders = [Collider((0, 150), 320, 30), Collider((1000, 0), 16, 16)]
+    camera.draw(renderer, colliders)
+    renderer.present()
+    assert renderer.surface.get_at((10, 160)) == (0, 0, 0)
+    assert renderer.surface.get_at((10, 140)) == (255, 255, 255)
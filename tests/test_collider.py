@@ -0,0 +1,24 @@
+from collider import Collider
+
+
+def test_sweep_pushes_out_of_geometry_it_starts_in():
+    floor = [Collider((0, 100), 200, 20)]
+    body = Collider((10, 95), 10, 10)
+    body.velocity.update(0, 60)
+    collision_types = body.sweep_collisions(1 / 60, floor)
+    assert collision_types[1]
+    assert body.rect.bottom == 100
+    assert body.position.y == 90
+
+    # resting flush on the floor is not embedded, the sweep lands as usual
+    collision_types = body.sweep_collisions(1 / 60, floor)
+    assert collision_types[1]
+    assert body.rect.bottom == 100
+
+
+def test_sweep_lands_from_above():
+    floor = [Collider((0, 100), 200, 20)]
+    body = Collider((10, 50), 10, 10)
+    body.velocity.update(0, 6000)
+    assert body.sweep_collisions(1 / 60, floor)[1]
+    assert body.position.y == 90
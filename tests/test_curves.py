@@ -0,0 +1,21 @@
+import pytest
+from curves import create_curve_array, get_segment_count
+
+POINTS = [(0, 0), (50, 100), (100, 0)]
+
+
+def test_create_curve_array_needs_one_spacing_argument():
+    with pytest.raises(ValueError):
+        create_curve_array(POINTS)
+    with pytest.raises(ValueError):
+        create_curve_array(POINTS, 8, 0.5)
+    assert create_curve_array(POINTS, 8).shape == (9, 2)
+    assert len(create_curve_array(POINTS, tolerance=0.5)) > 2
+
+
+@pytest.mark.parametrize("tolerance", [0, -1])
+def test_tolerance_must_be_positive(tolerance):
+    with pytest.raises(ValueError):
+        get_segment_count(POINTS, tolerance)
+    with pytest.raises(ValueError):
+        create_curve_array(POINTS, tolerance=tolerance)
@@ -0,0 +1,22 @@
+import os
+import shutil
+from manifest import bake, is_baked_current
+
+
+def test_baked_atlas_goes_stale_with_its_sheet(tmp_path, display):
+    for name in ("Triangle_Man.json", "Triangle_Man_Sprites.png"):
+        shutil.copy(name, tmp_path / name)
+    manifest_path = str(tmp_path / "Triangle_Man.json")
+    sheet_path = str(tmp_path / "Triangle_Man_Sprites.png")
+    baked_path = str(tmp_path / "Triangle_Man.atlas")
+    assert not is_baked_current(manifest_path, baked_path)
+
+    bake(manifest_path, baked_path)
+    baked_time = os.path.getmtime(baked_path)
+    os.utime(manifest_path, (baked_time - 10, baked_time - 10))
+    os.utime(sheet_path, (baked_time - 10, baked_time - 10))
+    assert is_baked_current(manifest_path, baked_path)
+
+    # editing only the sheet has to invalidate the bake too
+    os.utime(sheet_path, (baked_time + 10, baked_time + 10))
+    assert not is_baked_current(manifest_path, baked_path)
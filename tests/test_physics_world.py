@@ -0,0 +1,38 @@
+import pygame
+from physics_world import PhysicsWorld
+
+
+def test_body_handles_write_back_like_collider_attributes():
+    world = PhysicsWorld(2)
+    body = world.add((10, 20), 12, 14)
+    body.velocity.update(3, -4)
+    body.position += body.velocity * 2
+    assert tuple(world.positions[0]) == (16, 12)
+    body.position -= (6, 2)
+    assert body.position == (10, 10)
+
+    body.rect.x = 40
+    body.rect.bottom = 100
+    assert tuple(world.positions[0]) == (40, 86)
+    assert body.rect.topleft == (40, 86)
+    assert body.rect.right == 52
+
+    body.rect = pygame.Rect(5, 6, 7, 8)
+    assert tuple(world.positions[0]) == (5, 6)
+    assert tuple(world.sizes[0]) == (7, 8)
+    assert pygame.Rect(0, 0, 10, 10).colliderect(body.rect)
+
+    body.position = pygame.Vector2(1, 2)
+    assert body.position.lerp((3, 4), 0.5) == pygame.Vector2(2, 3)
+    assert isinstance(body.position - (1, 1), pygame.Vector2)
+
+
+def test_views_follow_a_body_moved_by_remove():
+    world = PhysicsWorld(4)
+    first = world.add((0, 0), 8, 8)
+    last = world.add((50, 60), 8, 8)
+    position = last.position
+    world.remove(first)
+    position.x = 70
+    assert tuple(world.positions[0]) == (70, 60)
+    assert last.rect.topleft == (70, 60)
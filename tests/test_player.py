@@ -0,0 +1,54 @@
+import pygame
+from animator import Animator, TransitionTable
+from benchmark import SCRIPT_CYCLE, PlayerScenario
+from manifest import Animations
+from player import PLAYER_TRANSITIONS, Player
+
+
+def test_player_keeps_the_animator_table():
+    animations = Animations.from_manifest("Triangle_Man.json")
+    table = TransitionTable()
+    # different order and rules from PLAYER_TRANSITIONS
+    table.add_state("Run")
+    table.add_state("Idle")
+    table.add_state("Transition")
+    table.add_state("Land", True, 5)
+    table.add_state("Jump", True, 2)
+    animator = animations.create_animator("Idle", table)
+    player = Player((0, 0), 12, 14, animator, "Idle")
+    assert animator.table is table
+    assert player.state_ids == (1, 0, 4, 3, 2)
+
+    player.on_ground = True
+    player.velocity.x = 10
+    player.set_animation()
+    assert animator.requested_id == table.ids["Run"]
+
+
+def test_player_falls_back_to_player_transitions():
+    animations = Animations.from_manifest("Triangle_Man.json")
+    animator = animations.create_animator("Idle")
+    animator.table = None
+    Player((0, 0), 12, 14, animator, "Idle")
+    assert animator.table is PLAYER_TRANSITIONS
+
+
+def test_landing_plays_land_once(monkeypatch):
+    scenario = PlayerScenario(pygame.Surface((320, 180)))
+    entered = []
+    enter_state = Animator.enter_state
+
+    def record(animator):
+        last = animator.current_state.state
+        enter_state(animator)
+        entered.append((last, animator.current_state.state))
+
+    monkeypatch.setattr(Animator, "enter_state", record)
+    for _ in range(SCRIPT_CYCLE):
+        scenario.step(1 / 60)
+
+    assert ("Jump", "Land") in entered
+    assert ("Land", "Land") not in entered
+    assert ("Transition", "Transition") not in entered
+    # the scripted run is still holding right when it lands, so Run cuts Land short
+    assert entered[entered.index(("Jump", "Land")) + 1] == ("Land", "Run")
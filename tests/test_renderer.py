@@ -0,0 +1,28 @@
+import pygame
+from benchmark import PlayerScenario
+from camera import Camera
+from renderer import DirtyRenderer, Renderer
+
+
+def test_dirty_renderer_matches_full_redraw(display):
+    background = (255, 241, 232)
+    scenario = PlayerScenario(pygame.Surface((320, 180)))
+    entities = [scenario.player]
+    camera = Camera((320, 180))
+    full = Renderer(display, (320, 180))
+    dirty = DirtyRenderer(display, (320, 180), background)
+    offset = camera.get_offset()
+
+    for frame in range(300):
+        scenario.step(1 / 60)
+        full.surface.fill(background)
+        camera.draw(full, entities)
+        full.queue.flush()
+        # the camera never moves, so every frame after the first is a partial update
+        dirty.begin(offset)
+        camera.draw(dirty, entities)
+        dirty.present()
+        assert not dirty.queue.layers.get(0)
+        assert pygame.image.tobytes(dirty.surface, "RGB") == pygame.image.tobytes(
+            full.surface, "RGB"
+        ), f"frame {frame}"
@@ -0,0 +1,34 @@
+import pygame
+import pytest
+from tilemap import TileMap
+
+
+@pytest.mark.parametrize("x, y", [(-1, 0), (4, 0), (0, -1), (0, 3)])
+def test_set_tile_rejects_out_of_range(x, y):
+    tilemap = TileMap(4, 3, 16)
+    changed = []
+    tilemap.listeners.append(lambda x, y: changed.append((x, y)))
+    with pytest.raises(IndexError):
+        tilemap.set_tile(x, y, 1)
+    assert not any(tilemap.tiles)
+    assert not changed
+
+
+def test_set_tile_notifies_listeners():
+    tilemap = TileMap(4, 3, 16)
+    changed = []
+    tilemap.listeners.append(lambda x, y: changed.append((x, y)))
+    tilemap.set_tile(3, 2, 1)
+    assert tilemap.get_tile(3, 2) == 1
+    assert changed == [(3, 2)]
+
+
+def test_get_collisions_reuses_rects():
+    tilemap = TileMap(4, 3, 16)
+    tilemap.set_tile(1, 1, 1)
+    tilemap.set_tile(2, 1, 1)
+    first = tilemap.get_collisions(pygame.Rect(0, 0, 64, 48))
+    assert first == [pygame.Rect(16, 16, 16, 16), pygame.Rect(32, 16, 16, 16)]
+    second = tilemap.get_collisions(pygame.Rect(32, 16, 8, 8))
+    assert second == [pygame.Rect(32, 16, 16, 16)]
+    assert second[0] is first[0]
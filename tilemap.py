@@ -0,0 +1,60 @@
+import pygame
+from array import array
+
+
+class TileMap:
+    def __init__(self, width: int, height: int, tile_size: int):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        # one byte per tile, 0 is empty and anything else is solid
+        self.tiles = array("B", bytes(width * height))
+        # called with (x, y) whenever a tile changes, e.g. to drop cached renders
+        self.listeners = []
+        # rects handed out by get_collisions, moved into place on every query
+        self.collision_rects = []
+
+    @classmethod
+    def from_grid(cls, grid: list[list[int]], tile_size: int):
+        tilemap = cls(max((len(row) for row in grid), default=0), len(grid), tile_size)
+        for y, row in enumerate(grid):
+            for x, tile in enumerate(row):
+                tilemap.set_tile(x, y, tile)
+        return tilemap
+
+    def get_tile(self, x: int, y: int):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.tiles[y * self.width + x]
+        return 0
+
+    def set_tile(self, x: int, y: int, tile: int):
+        # out of range indexes would wrap onto another row instead of failing
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"tile ({x}, {y}) is outside the map")
+        self.tiles[y * self.width + x] = tile
+        for listener in self.listeners:
+            listener(x, y)
+
+    def get_collisions(self, rect: pygame.Rect, rects: list = None):
+        # only the tiles under the rect are checked, so cost doesn't grow with the level
+        # the rects are reused by the next query, copy any that need to be kept
+        if rects is None:
+            rects = []
+        pool = self.collision_rects
+        count = 0
+        ts = self.tile_size
+        left = max(rect.left // ts, 0)
+        right = min(max(rect.right - 1, rect.left) // ts, self.width - 1)
+        top = max(rect.top // ts, 0)
+        bottom = min(max(rect.bottom - 1, rect.top) // ts, self.height - 1)
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                if self.tiles[y * self.width + x]:
+                    if count == len(pool):
+                        pool.append(pygame.Rect(0, 0, ts, ts))
+                    tile_rect = pool[count]
+                    tile_rect.x = x * ts
+                    tile_rect.y = y * ts
+                    rects.append(tile_rect)
+                    count += 1
+        return rects
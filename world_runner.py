@@ -0,0 +1,221 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from animator import AnimationScheduler
+from collider import Collider
+from input_source import InputKeys
+from manifest import Animations
+from player import Player
+
+# actions are the same per-step bitmasks that input sources produce
+OBSERVATION_FIELDS = ("x", "y", "velocity_x", "velocity_y", "on_ground", "state")
+
+ANIMATIONS = None
+
+
+def get_animations():
+    # loaded once per process, every world's animator shares the frames
+    global ANIMATIONS
+    if ANIMATIONS is None:
+        ANIMATIONS = Animations.load("Triangle_Man.json", "Triangle_Man.atlas")
+    return ANIMATIONS
+
+
+def create_world(index: int):
+    player = Player((16, 0), 12, 14, get_animations().create_animator("Idle"), "Idle")
+    return player, [Collider((-10000, 150), 20000, 30)]
+
+
+def attach_arrays(actions_name: str, observations_name: str, count: int):
+    actions_memory = shared_memory.SharedMemory(actions_name)
+    observations_memory = shared_memory.SharedMemory(observations_name)
+    actions = np.ndarray((count,), np.uint8, actions_memory.buf)
+    observations = np.ndarray(
+        (count, len(OBSERVATION_FIELDS)), np.float32, observations_memory.buf
+    )
+    return actions_memory, observations_memory, actions, observations
+
+
+def run_worker(
+    actions_name: str,
+    observations_name: str,
+    count: int,
+    first: int,
+    last: int,
+    step: float,
+    gravity: float,
+    create_world,
+    start_barrier,
+    done_barrier,
+    stopping,
+):
+    actions_memory, observations_memory, actions, observations = attach_arrays(
+        actions_name, observations_name, count
+    )
+    try:
+        scheduler = AnimationScheduler()
+        worlds = []
+        for index in range(first, last):
+            player, colliders = create_world(index)
+            player.keys = InputKeys()
+            scheduler.add(player.animator)
+            worlds.append((index, player, colliders))
+        done_barrier.wait()
+
+        while True:
+            start_barrier.wait()
+            if stopping.is_set():
+                break
+            scheduler.update(step)
+            for index, player, colliders in worlds:
+                player.keys.mask = actions[index]
+                player.update(step, gravity, colliders)
+                observations[index] = (
+                    player.position.x,
+                    player.position.y,
+                    player.velocity.x,
+                    player.velocity.y,
+                    player.on_ground,
+                    player.animator.current_state.state_id,
+                )
+            done_barrier.wait()
+    except BaseException:
+        # wakes the runner with BrokenBarrierError instead of leaving it waiting
+        start_barrier.abort()
+        done_barrier.abort()
+        raise
+    finally:
+        del actions, observations
+        actions_memory.close()
+        observations_memory.close()
+
+
+class WorldRunner:
+    def __init__(
+        self,
+        count: int,
+        workers: int = None,
+        step: float = 1 / 60,
+        gravity: float = 400,
+        create_world=create_world,
+        timeout: float = 60,
+    ):
+        # create_world has to be a module level function so workers can import it
+        self.count = count
+        workers = max(min(workers or os.cpu_count() or 1, count), 1)
+        context = multiprocessing.get_context("spawn")
+
+        # actions in and observations out live in shared memory, nothing per step
+        # is pickled, each worker only touches its own rows
+        self.actions_memory = shared_memory.SharedMemory(create=True, size=count)
+        self.observations_memory = shared_memory.SharedMemory(
+            create=True, size=count * len(OBSERVATION_FIELDS) * 4
+        )
+        self.actions = np.ndarray((count,), np.uint8, self.actions_memory.buf)
+        self.actions[:] = 0
+        self.observations = np.ndarray(
+            (count, len(OBSERVATION_FIELDS)), np.float32, self.observations_memory.buf
+        )
+        self.observations[:] = 0
+
+        self.start_barrier = context.Barrier(workers + 1)
+        self.done_barrier = context.Barrier(workers + 1)
+        self.stopping = context.Event()
+        self.workers = []
+        for i in range(workers):
+            worker = context.Process(
+                target=run_worker,
+                args=(
+                    self.actions_memory.name,
+                    self.observations_memory.name,
+                    count,
+                    count * i // workers,
+                    count * (i + 1) // workers,
+                    step,
+                    gravity,
+                    create_world,
+                    self.start_barrier,
+                    self.done_barrier,
+                    self.stopping,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+        # wait until every world is built, a worker that never starts breaks the
+        # barrier after timeout rather than hanging here
+        try:
+            self.done_barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            self.close()
+            raise
+
+    def step(self, actions: np.ndarray = None):
+        # the returned observations are the shared array, copy them to keep them
+        if actions is not None:
+            self.actions[:] = actions
+        self.start_barrier.wait()
+        self.done_barrier.wait()
+        return self.observations
+
+    def close(self):
+        if not self.workers:
+            return
+        self.stopping.set()
+        if not self.start_barrier.broken:
+            self.start_barrier.wait()
+        for worker in self.workers:
+            worker.join(1)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        del self.actions, self.observations
+        for memory in (self.actions_memory, self.observations_memory):
+            memory.close()
+            memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="step many headless worlds")
+    parser.add_argument("--worlds", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=600)
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with WorldRunner(args.worlds, args.workers, args.dt) as runner:
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            runner.step(rng.integers(0, 16, args.worlds, np.uint8))
+        total = time.perf_counter() - start
+        print(
+            json.dumps(
+                {
+                    "worlds": args.worlds,
+                    "workers": len(runner.workers),
+                    "steps": args.steps,
+                    "world_steps_per_second": args.worlds * args.steps / total,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()